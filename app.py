@@ -3,20 +3,223 @@
 # 1. Importing necessary libraries
 import numpy as np
 import pandas as pd
-from flask import Flask, request, jsonify, render_template_string, Response
-import pickle
+from flask import Flask, request, jsonify, render_template_string, Response, stream_with_context, g, has_request_context
 import io
+import json
+import operator
+import os
+import hmac
+import threading
+import time
+import random
+import cProfile
+import gzip
+import hashlib
+import functools
+import multiprocessing
+
+try:
+    # Optional: lets the landing page go out brotli-compressed as well as gzipped.
+    import brotli
+except ImportError:
+    brotli = None
+
+import model_files
+from batcher import PredictionBatcher
+from parallel import ParallelScorer
+from prediction_cache import PredictionCache
+import bulk_formats
+from metrics import Registry, Counter, Gauge, Histogram, CallbackMetric
 
 # 2. Initialize the Flask app
 app = Flask(__name__)
 
+# Hot-path instrumentation, served in Prometheus text format on /metrics.
+metrics_registry = Registry()
+REQUESTS_TOTAL = metrics_registry.register(Counter(
+    'heart_requests_total', 'Requests handled, by route and HTTP status.', ('route', 'status')))
+REQUEST_SECONDS = metrics_registry.register(Histogram(
+    'heart_request_duration_seconds', 'Time until the view returns (for streamed responses, until streaming starts).', ('route',)))
+STAGE_SECONDS = metrics_registry.register(Histogram(
+    'heart_stage_duration_seconds', 'Time spent in each stage of a request, summed over chunks when streaming.', ('route', 'stage')))
+ROWS_PER_REQUEST = metrics_registry.register(Histogram(
+    'heart_rows_per_request', 'Patient rows scored per successful request.', ('route',),
+    buckets=(1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)))
+REQUEST_BYTES = metrics_registry.register(Counter(
+    'heart_request_bytes_total', 'Request body bytes received.', ('route',)))
+RESPONSE_BYTES = metrics_registry.register(Counter(
+    'heart_response_bytes_total', 'Response body bytes sent.', ('route',)))
+MODEL_LOAD_SECONDS = metrics_registry.register(Gauge(
+    'heart_model_load_seconds', 'Time taken by the most recent model load.'))
+# Routes whose rows are counted in ROWS_PER_REQUEST.
+SCORING_ROUTES = ('predict', 'batch_predict', 'bulk_predict')
+
+# Optional sampling profiler: HEART_PROFILE_SAMPLE_RATE=0.01 runs cProfile on
+# 1% of requests and writes each profile to HEART_PROFILE_DIR.
+PROFILE_SAMPLE_RATE = float(os.environ.get('HEART_PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.environ.get('HEART_PROFILE_DIR', 'profiles')
+
+def stage(name):
+    """Times a stage of the current request, e.g. `with stage('inference'):`."""
+    return STAGE_SECONDS.time(route=request.endpoint, stage=name)
+
+def count_rows(n):
+    """Adds n scored rows to the current request's total."""
+    if has_request_context():
+        g.rows = g.get('rows', 0) + n
+
 # 3. Load the pre-trained model
 # IMPORTANT: Make sure 'random_forest_heart_model.pkl' is in the same directory.
+MODEL_PATH = 'random_forest_heart_model.pkl'
+# Flat artifact written by export_model.py. When it exists it is memory-mapped
+# instead of compiling the unpickled model, so forked workers share its pages.
+ARTIFACT_PATH = os.environ.get('HEART_MODEL_ARTIFACT', 'random_forest_heart_model.rfn')
+# The compiled engine beats sklearn on single rows and small batches but is
+# slower from a few hundred rows up, so larger inputs go to the sklearn
+# forest whenever one is loaded (see benchmarks/bench_engine.py).
+ENGINE_MAX_ROWS = int(os.environ.get('HEART_ENGINE_MAX_ROWS', '256'))
+# HEART_ARTIFACT_ONLY=1 serves from the artifact alone even when the pickle
+# is present: faster start-up and less memory, but slower bulk scoring.
+ARTIFACT_ONLY = os.environ.get('HEART_ARTIFACT_ONLY', '0') == '1'
+
+def load_model():
+    """Loads the model, preferring the artifact. Returns (model, engine, source path).
+
+    See model_files.load_model for which of the two files score what.
+    """
+    start = time.perf_counter()
+    loaded = model_files.load_model(MODEL_PATH, ARTIFACT_PATH, ARTIFACT_ONLY)
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+    return loaded
+
 try:
-    model = pickle.load(open('random_forest_heart_model.pkl', 'rb'))
+    model, engine, model_source = load_model()
 except FileNotFoundError:
     print("Error: 'random_forest_heart_model.pkl' not found.")
-    model = None
+    model, engine, model_source = None, None, MODEL_PATH
+
+def scorer_for(n_rows):
+    """Returns the engine for inputs of up to ENGINE_MAX_ROWS rows, else the sklearn forest."""
+    if engine is not None and n_rows <= ENGINE_MAX_ROWS:
+        return engine
+    return model
+
+def predict_matrix(X):
+    """Scores a 2-D feature array with whichever model is currently loaded."""
+    return scorer_for(len(X)).predict(X)
+
+# Optional multi-core scoring for /bulk_predict. HEART_BULK_WORKERS sets the
+# size of the process pool (0, the default, scores in the request thread);
+# inputs are split into partitions of at least HEART_BULK_PARTITION_ROWS rows.
+# Created before any background threads start, since the pool forks. Workers
+# reload the model through model_files, so under spawn they never import
+# this module; the parent_process() check covers `python app.py`, whose
+# module spawn does run again in every worker as __mp_main__.
+BULK_WORKERS = int(os.environ.get('HEART_BULK_WORKERS', '0'))
+BULK_PARTITION_ROWS = int(os.environ.get('HEART_BULK_PARTITION_ROWS', '20000'))
+bulk_scorer = None
+if model and BULK_WORKERS > 0 and multiprocessing.parent_process() is None:
+    bulk_scorer = ParallelScorer(model, BULK_WORKERS, BULK_PARTITION_ROWS, loader=functools.partial(
+        model_files.load_bulk_model, MODEL_PATH, ARTIFACT_PATH, ARTIFACT_ONLY))
+
+# Optional micro-batching of concurrent /predict calls.
+# HEART_BATCH_MAX_SIZE=0 (the default) scores every request on its own.
+BATCH_MAX_SIZE = int(os.environ.get('HEART_BATCH_MAX_SIZE', '0'))
+BATCH_MAX_WAIT_MS = float(os.environ.get('HEART_BATCH_MAX_WAIT_MS', '2'))
+batcher = None
+if model and BATCH_MAX_SIZE > 1:
+    batcher = PredictionBatcher(predict_matrix, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS / 1000)
+
+# LRU cache of /predict results keyed on the canonical feature row, dropped
+# whenever a new model is swapped in. HEART_CACHE_SIZE=0 disables it.
+CACHE_SIZE = int(os.environ.get('HEART_CACHE_SIZE', '4096'))
+prediction_cache = PredictionCache(CACHE_SIZE) if model and CACHE_SIZE > 0 else None
+
+# Batcher and cache statistics, read at scrape time.
+for _name, _kind, _doc, _read in (
+    ('heart_cache_hits_total', 'counter', 'Prediction cache hits.', lambda: prediction_cache and prediction_cache.stats()['hits']),
+    ('heart_cache_misses_total', 'counter', 'Prediction cache misses.', lambda: prediction_cache and prediction_cache.stats()['misses']),
+    ('heart_cache_evictions_total', 'counter', 'Prediction cache evictions.', lambda: prediction_cache and prediction_cache.stats()['evictions']),
+    ('heart_batcher_queue_depth', 'gauge', 'Rows waiting for the micro-batcher.', lambda: batcher and batcher.stats()['queue_depth']),
+    ('heart_batcher_batches_total', 'counter', 'Batches scored by the micro-batcher.', lambda: batcher and batcher.stats()['batches']),
+    ('heart_batcher_mean_batch_size', 'gauge', 'Mean rows per micro-batch.', lambda: batcher and batcher.stats()['mean_batch_size']),
+):
+    metrics_registry.register(CallbackMetric(_name, _doc, _read, kind=_kind))
+
+# Hot reload: POST /admin/reload (with the X-Admin-Token header matching
+# HEART_ADMIN_TOKEN) or set HEART_RELOAD_INTERVAL to poll the model files
+# every that many seconds and reload when either changes.
+ADMIN_TOKEN = os.environ.get('HEART_ADMIN_TOKEN', '')
+RELOAD_INTERVAL = float(os.environ.get('HEART_RELOAD_INTERVAL', '0'))
+_reload_lock = threading.Lock()
+
+def file_signature(path):
+    """Returns a value that changes whenever the file at path is replaced or rewritten."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def reload_model():
+    """Loads the model from disk again and swaps it in.
+
+    Requests already running keep the objects they started with (an old
+    memory map stays valid until nothing references it); new requests see
+    the new model as soon as the globals are rebound. The exception is the
+    bulk process pool: partitions it starts after the swap use the new model.
+    """
+    global model, engine, model_source
+    with _reload_lock:
+        new_model, new_engine, new_source = load_model()
+        if bulk_scorer:
+            # The pool is never re-forked: this process is running threads by
+            # now, and a child forked while one holds a lock can deadlock.
+            # Each worker loads the new model before its next partition.
+            bulk_scorer.set_model(new_model)
+        engine, model, model_source = new_engine, new_model, new_source
+        # After the swap: labels computed before it are then never stored.
+        if prediction_cache:
+            prediction_cache.clear()
+    print(f"Reloaded model from {new_source}.")
+
+def model_files_signature():
+    return (file_signature(MODEL_PATH), file_signature(ARTIFACT_PATH))
+
+def watch_model_files(signature):
+    """Polls the pickle and artifact and reloads when either changes."""
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        current = model_files_signature()
+        if current != signature:
+            signature = current
+            try:
+                reload_model()
+            except Exception as e:
+                print(f"Error: model reload failed, keeping the current model ({e}).")
+
+if model and RELOAD_INTERVAL > 0:
+    threading.Thread(
+        target=watch_model_files, args=(model_files_signature(),), name='model-watcher', daemon=True
+    ).start()
+
+# Request bodies sent as NDJSON to /batch_predict are scored and streamed back
+# in chunks of BULK_CHUNK_ROWS lines.
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Columns every bulk upload must contain, in the order the model expects them.
+REQUIRED_COLUMNS = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+# Streaming bulk mode: parse the CSV in fixed-size row chunks and send each
+# scored chunk back as soon as it is ready, so memory stays flat regardless
+# of upload size. Enable per request with ?stream=1 or for every request with
+# HEART_BULK_STREAM=1. Features are parsed as float32, the type the forest
+# compares them in, so fractional values and blank cells are accepted just
+# as in the buffered path. Any other columns are read as text and written
+# back exactly as they were sent.
+BULK_STREAM = os.environ.get('HEART_BULK_STREAM', '0') == '1'
+BULK_CHUNK_ROWS = int(os.environ.get('HEART_BULK_CHUNK_ROWS', '50000'))
+BULK_DTYPES = {col: 'float32' for col in REQUIRED_COLUMNS}
 
 # 4. Define the updated HTML template with a landing page
 HTML_TEMPLATE = """
@@ -26,11 +229,10 @@ HTML_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Heart Disease Prediction</title>
-    <script src="https://cdn.tailwindcss.com"></script>
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
+{{ stylesheet|safe }}
         body {
-            font-family: 'Roboto', sans-serif;
+            font-family: 'Roboto', system-ui, -apple-system, 'Segoe UI', sans-serif;
         }
         .form-select {
             background-image: url("data:image/svg+xml,%3csvg xmlns='http://www.w3.org/2000/svg' fill='none' viewBox='0 0 20 20'%3e%3cpath stroke='%236b7280' stroke-linecap='round' stroke-linejoin='round' stroke-width='1.5' d='M6 8l4 4 4-4'/%3e%3c/svg%3e");
@@ -180,13 +382,13 @@ HTML_TEMPLATE = """
             <div id="panel-bulk" style="display: none;">
                  <form action="/bulk_predict" method="post" enctype="multipart/form-data">
                     <div class="text-center">
-                        <label for="bulk_file" class="block text-sm font-medium text-gray-700 mb-2">Upload a CSV file with patient data:</label>
+                        <label for="bulk_file" class="block text-sm font-medium text-gray-700 mb-2">Upload a CSV, Parquet or Arrow file with patient data:</label>
                         <input type="file" name="bulk_file" id="bulk_file" required class="mx-auto block w-full max-w-xs text-sm text-gray-500 file:mr-4 file:py-2 file:px-4 file:rounded-md file:border-0 file:text-sm file:font-semibold file:bg-indigo-50 file:text-indigo-700 hover:file:bg-indigo-100">
-                        <p class="mt-2 text-xs text-gray-500">CSV should have columns: age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal</p>
+                        <p class="mt-2 text-xs text-gray-500">The file should have columns: age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal. Results come back in the same format.</p>
                     </div>
                     <div class="text-center mt-6">
                         <button type="submit" class="w-full md:w-auto inline-flex justify-center items-center px-8 py-3 border border-transparent text-base font-medium rounded-md shadow-sm text-white bg-indigo-600 hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 transition-all">
-                            Predict and Download CSV
+                            Predict and Download
                         </button>
                     </div>
                 </form>
@@ -289,11 +491,95 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# The page's CSS is prebuilt (static/styles.css) and inlined, so the page
+# needs no network access once it has loaded.
+with open(os.path.join(app.root_path, 'static', 'styles.css')) as f:
+    STYLESHEET = f.read()
+
+# The landing page only depends on whether a model is loaded, so it is
+# rendered and compressed once per state rather than on every request.
+_landing_pages = {}
+
+def landing_page(model_loaded):
+    """Returns {encoding: (body, etag)} for the page, rendering it on first use."""
+    page = _landing_pages.get(model_loaded)
+    if page is None:
+        with app.app_context():
+            html = render_template_string(HTML_TEMPLATE, model=model_loaded, stylesheet=STYLESHEET).encode()
+        digest = hashlib.sha256(html).hexdigest()[:32]
+        page = {'identity': (html, digest), 'gzip': (gzip.compress(html, 9, mtime=0), f'{digest}-gz')}
+        if brotli:
+            page['br'] = (brotli.compress(html, quality=11), f'{digest}-br')
+        _landing_pages[model_loaded] = page
+    return page
+
 # 5. Define the routes for the web application 
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request is already being profiled in this interpreter.
+            return
+        g.profiler = profiler
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.endpoint or 'unmatched'
+    REQUESTS_TOTAL.inc(route=route, status=response.status_code)
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, route=route)
+    REQUEST_BYTES.inc(request.content_length or 0, route=route)
+    profiler = g.pop('profiler', None)
+    if profiler:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{time.time():.6f}-{route}.prof"))
+    count_scored = route in SCORING_ROUTES and response.status_code < 400
+    if response.is_streamed:
+        response.response = count_streamed(response.response, route, g._get_current_object(), count_scored)
+    else:
+        RESPONSE_BYTES.inc(len(response.get_data()), route=route)
+        if count_scored:
+            ROWS_PER_REQUEST.observe(g.get('rows', 0), route=route)
+    return response
+
+def count_streamed(chunks, route, request_globals, count_scored):
+    """Passes a streamed body through, recording its size and rows once it is finished."""
+    sent = 0
+    try:
+        for chunk in chunks:
+            sent += len(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        RESPONSE_BYTES.inc(sent, route=route)
+        if count_scored:
+            ROWS_PER_REQUEST.observe(request_globals.get('rows', 0), route=route)
+
+@app.route('/metrics')
+def metrics():
+    """Exposes request, stage and model metrics in Prometheus text format."""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def home():
-    """Renders the main page."""
-    return render_template_string(HTML_TEMPLATE, model=model)
+    """Serves the main page, precompressed and revalidated by ETag."""
+    page = landing_page(model is not None)
+    encoding = next((e for e in ('br', 'gzip') if e in page and request.accept_encodings[e]), 'identity')
+    body, etag = page[encoding]
+    response = Response(body, mimetype='text/html')
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    # Browsers may keep the page but must check back, so a reload after the
+    # model state changes still picks up the new page (a 304 otherwise).
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -301,21 +587,158 @@ def predict():
     if not model:
         return jsonify({'error': 'Model not loaded'}), 500
     try:
-        data = request.get_json(force=True)
-        features = [
-            data['age'], data['sex'], data['cp'], data['trestbps'],
-            data['chol'], data['fbs'], data['restecg'], data['thalach'],
-            data['exang'], data['oldpeak'], data['slope'], data['ca'], data['thal']
-        ]
-        final_features = [np.array(features)]
-        prediction = model.predict(final_features)
-        return jsonify({'prediction': int(prediction[0])})
+        with stage('parse_json'):
+            data = request.get_json(force=True)
+        with stage('assemble_features'):
+            features = [
+                data['age'], data['sex'], data['cp'], data['trestbps'],
+                data['chol'], data['fbs'], data['restecg'], data['thalach'],
+                data['exang'], data['oldpeak'], data['slope'], data['ca'], data['thal']
+            ]
+        with stage('inference'):
+            if prediction_cache:
+                prediction = prediction_cache.lookup(features, score_features)
+            else:
+                prediction = score_features(features)
+        count_rows(1)
+        with stage('serialize'):
+            return jsonify({'prediction': prediction})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+def score_features(features):
+    """Runs inference for one feature row and returns its label."""
+    if batcher:
+        return int(batcher.predict(features))
+    final_features = [np.array(features)]
+    prediction = scorer_for(1).predict(final_features)
+    return int(prediction[0])
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Reports hit, miss and eviction counters for the prediction cache."""
+    if not prediction_cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_cache.stats()})
+
+@app.route('/batch_stats')
+def batch_stats():
+    """Reports queue-depth and batch-size statistics for the request coalescer."""
+    if not batcher:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **batcher.stats()})
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reloads the model from disk without restarting the app."""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Reload is disabled; set HEART_ADMIN_TOKEN to enable it'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    try:
+        reload_model()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'reloaded': True, 'source': model_source})
+
+@app.route('/batch_predict', methods=['POST'])
+def batch_predict():
+    """Handles batch predictions from columnar JSON or streamed NDJSON.
+
+    JSON bodies hold one array per feature, e.g. {"age": [52, 53], ...}, and
+    get back {"prediction": [...], "probability": [...]}. NDJSON bodies hold one
+    patient object per line and get one result object per line, streamed.
+    """
+    if not model:
+        return jsonify({'error': 'Model not loaded'}), 500
+    if request.mimetype in NDJSON_MIMETYPES:
+        return stream_batch_predict()
+    try:
+        with stage('parse_json'):
+            data = request.get_json(force=True)
+        missing = [col for col in REQUIRED_COLUMNS if col not in data]
+        if missing:
+            return jsonify({'error': f"Missing feature arrays: {', '.join(missing)}"}), 400
+        with stage('assemble_features'):
+            columns = [np.asarray(data[col], dtype=np.float64) for col in REQUIRED_COLUMNS]
+            if any(column.ndim != 1 or len(column) != len(columns[0]) for column in columns):
+                return jsonify({'error': 'Feature arrays must be flat and of equal length'}), 400
+            X = np.column_stack(columns) if len(columns[0]) else None
+        if X is None:
+            return jsonify({'prediction': [], 'probability': []})
+        labels, probability = predict_proba_rows(X)
+        with stage('serialize'):
+            return jsonify({'prediction': labels.tolist(), 'probability': probability.tolist()})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+# Picks the features out of one parsed NDJSON line, in model order.
+NDJSON_FEATURES = operator.itemgetter(*REQUIRED_COLUMNS)
+
+def read_ndjson_chunks(stream, chunk_rows):
+    """Yields the feature matrix of every chunk_rows lines of an NDJSON body.
+
+    Each line must be an object with all 13 feature keys; null marks a
+    missing value. A line without one of the keys, e.g. with "chl" typed
+    for "chol", raises ValueError instead of being scored as missing.
+    """
+    rows = []
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        try:
+            rows.append(NDJSON_FEATURES(record))
+        except (KeyError, TypeError):
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {number} is not a JSON object") from None
+            missing = [col for col in REQUIRED_COLUMNS if col not in record]
+            raise ValueError(f"Line {number} is missing features: {', '.join(missing)}") from None
+        if len(rows) == chunk_rows:
+            yield np.asarray(rows, dtype=np.float64)
+            rows = []
+    if rows:
+        yield np.asarray(rows, dtype=np.float64)
+
+def predict_chunk_ndjson(X):
+    """Scores one chunk of NDJSON rows and returns the result lines."""
+    labels, probability = predict_proba_rows(X)
+    with stage('serialize'):
+        result = pd.DataFrame({'prediction': labels, 'probability': probability})
+        return result.to_json(orient='records', lines=True, double_precision=15).rstrip('\n') + '\n'
+
+def stream_batch_predict():
+    """Scores an NDJSON request body chunk by chunk and streams NDJSON back."""
+    try:
+        reader = read_ndjson_chunks(request.stream, BULK_CHUNK_ROWS)
+        # Score the first chunk before responding so bad input still gets a 400.
+        with stage('ndjson_parse'):
+            first = next(reader, None)
+        if first is None:
+            return Response('', mimetype='application/x-ndjson')
+        head = predict_chunk_ndjson(first)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        yield head
+        while True:
+            try:
+                with stage('ndjson_parse'):
+                    chunk = next(reader, None)
+                if chunk is None:
+                    break
+                body = predict_chunk_ndjson(chunk)
+            except Exception as e:
+                yield json.dumps({'error': stream_error_message(e)}) + '\n'
+                break
+            yield body
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/bulk_predict', methods=['POST'])
 def bulk_predict():
-    """Handles bulk prediction from a CSV file."""
+    """Handles bulk prediction from a CSV, Parquet, Arrow IPC or .npy file."""
     if not model:
         return "Error: Model not loaded.", 500
     if 'bulk_file' not in request.files:
@@ -323,17 +746,23 @@ def bulk_predict():
     file = request.files['bulk_file']
     if file.filename == '':
         return "No selected file", 400
-    if file and file.filename.endswith('.csv'):
+    fmt = bulk_formats.bulk_format(file.filename)
+    if fmt and fmt != 'csv':
+        return columnar_bulk_predict(file, fmt)
+    if fmt == 'csv':
+        if request.args.get('stream', '1' if BULK_STREAM else '0') == '1':
+            return stream_bulk_predict(file)
         try:
-            df = pd.read_csv(file)
-            required_columns = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
-            if not all(col in df.columns for col in required_columns):
-                return f"CSV must contain the following columns: {', '.join(required_columns)}", 400
-            predictions = model.predict(df[required_columns])
+            with stage('csv_parse'):
+                df = pd.read_csv(file)
+            if not all(col in df.columns for col in REQUIRED_COLUMNS):
+                return f"CSV must contain the following columns: {', '.join(REQUIRED_COLUMNS)}", 400
+            predictions = predict_rows(df[REQUIRED_COLUMNS])
             df['prediction'] = predictions
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
+            with stage('csv_serialize'):
+                output = io.StringIO()
+                df.to_csv(output, index=False)
+                output.seek(0)
             return Response(
                 output,
                 mimetype="text/csv",
@@ -341,7 +770,115 @@ def bulk_predict():
             )
         except Exception as e:
             return f"An error occurred: {str(e)}", 500
-    return "Invalid file type. Please upload a CSV.", 400
+    return "Invalid file type. Please upload a CSV, Parquet, Arrow or .npy file.", 400
+
+def columnar_bulk_predict(file, fmt):
+    """Scores a binary upload and replies in the same format."""
+    try:
+        with stage(f'{fmt}_parse'):
+            data, fmt = bulk_formats.read_upload(file.stream, fmt)
+        if fmt == 'npy':
+            if data.ndim != 2 or data.shape[1] != len(REQUIRED_COLUMNS) or data.dtype.kind not in 'fiu':
+                return f".npy file must hold a numeric (rows, {len(REQUIRED_COLUMNS)}) matrix with columns: {', '.join(REQUIRED_COLUMNS)}", 400
+            X = data
+        else:
+            if not all(col in data.column_names for col in REQUIRED_COLUMNS):
+                return f"File must contain the following columns: {', '.join(REQUIRED_COLUMNS)}", 400
+            with stage('assemble_features'):
+                X = bulk_formats.feature_matrix(data, REQUIRED_COLUMNS)
+        predictions = predict_rows(X) if len(X) else np.empty(0, dtype=np.int64)
+        with stage(f"{fmt.split('-')[0]}_serialize"):
+            body, mimetype, filename = bulk_formats.write_result(data, predictions, fmt)
+        return Response(body, mimetype=mimetype, headers={"Content-Disposition": f"attachment;filename={filename}"})
+    except ImportError as e:
+        return str(e), 400
+    except Exception as e:
+        return f"An error occurred: {str(e)}", 500
+
+def predict_rows(X):
+    """Scores a bulk feature matrix, on the process pool when one is configured."""
+    count_rows(len(X))
+    with stage('inference'):
+        if bulk_scorer and len(X) > ENGINE_MAX_ROWS:
+            return bulk_scorer.predict(X)
+        return scorer_for(len(X)).predict(X)
+
+def predict_proba_rows(X):
+    """Returns (labels, probability of heart disease) for a bulk feature matrix."""
+    count_rows(len(X))
+    with stage('inference'):
+        if bulk_scorer and len(X) > ENGINE_MAX_ROWS:
+            proba = bulk_scorer.predict_proba(X)
+        else:
+            proba = scorer_for(len(X)).predict_proba(X)
+        labels = model.classes_.take(np.argmax(proba, axis=1))
+    return labels, proba[:, list(model.classes_).index(1)]
+
+def stream_error_message(error):
+    """Logs a failure in a later chunk of a streamed response and returns its message.
+
+    The 200 status and the earlier rows are already sent by then, so the
+    caller ends the response with a marker line holding this message
+    instead of cutting it short.
+    """
+    print(f"Error: streamed response aborted ({error}).")
+    return f"An error occurred: {' '.join(str(error).split())}"
+
+def predict_chunk_csv(chunk, header):
+    """Scores one chunk of rows and returns it as CSV text."""
+    chunk['prediction'] = predict_rows(chunk[REQUIRED_COLUMNS]) if len(chunk) else []
+    with stage('csv_serialize'):
+        # Seven significant digits give back any feature value float32 holds
+        # exactly as typed, so 52 stays 52 rather than 52.0. Only the
+        # features are floats here; other columns are passed through as text.
+        return chunk.to_csv(index=False, header=header, float_format='%.7g')
+
+def stream_bulk_predict(file):
+    """Scores an uploaded CSV chunk by chunk and streams the result back."""
+    # Take ownership of the upload: Flask closes request files as soon as the
+    # view returns, before the streamed response has been generated.
+    stream, file.stream = file.stream, io.BytesIO()
+    try:
+        header = pd.read_csv(stream, nrows=0).columns
+        if not all(col in header for col in REQUIRED_COLUMNS):
+            stream.close()
+            return f"CSV must contain the following columns: {', '.join(REQUIRED_COLUMNS)}", 400
+        stream.seek(0)
+        dtypes = {col: BULK_DTYPES.get(col, str) for col in header}
+        reader = pd.read_csv(stream, chunksize=BULK_CHUNK_ROWS, dtype=dtypes)
+        # Score the first chunk before responding so bad input still gets a 500.
+        with stage('csv_parse'):
+            first = next(reader, None)
+        if first is None:
+            first = pd.DataFrame(columns=header)
+        head = predict_chunk_csv(first, header=True)
+    except Exception as e:
+        stream.close()
+        return f"An error occurred: {str(e)}", 500
+
+    def generate():
+        try:
+            yield head
+            while True:
+                try:
+                    with stage('csv_parse'):
+                        chunk = next(reader, None)
+                    if chunk is None:
+                        break
+                    body = predict_chunk_csv(chunk, header=False)
+                except Exception as e:
+                    yield f"# {stream_error_message(e)}\n"
+                    break
+                yield body
+        finally:
+            reader.close()
+            stream.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment;filename=predictions.csv"}
+    )
 
 # 6. Run the app
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+# --- Async (ASGI) serving mode ---
+#
+# Serves the same routes as app.py from an asyncio event loop, so idle
+# keep-alive connections and slow uploads cost a coroutine rather than a
+# worker thread. Request bodies are read without blocking and spooled to a
+# temporary file; the CPU-bound part of each request (parsing, model.predict,
+# serialization) then runs the Flask view on a bounded thread pool. When the
+# pool and its queue are full the request gets 429 before its body is read.
+# A request only takes a slot once its body is in, and a streamed response
+# only holds one while its next chunk is computed, so neither a slow upload
+# nor a slow download keeps a slot from requests that are ready to run.
+#
+# Usage: uvicorn asgi:app   (or: python asgi.py [--host 127.0.0.1] [--port 8000])
+#
+# Set HEART_ASGI_WORKERS for the number of inference threads (default: CPU
+# count), HEART_ASGI_QUEUE for how many more requests may wait for one, and
+# HEART_ASGI_ADMIT_WAIT for how many seconds a received request may wait for
+# a slot before it gets 429 (default 5).
+
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import app as flask_app
+from metrics import Counter, CallbackMetric
+
+ASGI_WORKERS = int(os.environ.get('HEART_ASGI_WORKERS', str(os.cpu_count() or 1)))
+ASGI_QUEUE = int(os.environ.get('HEART_ASGI_QUEUE', '64'))
+ASGI_ADMIT_WAIT = float(os.environ.get('HEART_ASGI_ADMIT_WAIT', '5'))
+# Bodies larger than this are spooled to disk while they are received.
+SPOOL_MAX_BYTES = 1024 * 1024
+
+REJECTED_TOTAL = flask_app.metrics_registry.register(Counter(
+    'heart_asgi_rejected_total', 'Requests refused with 429 because the inference queue was full.'))
+IN_FLIGHT = flask_app.metrics_registry.register(CallbackMetric(
+    'heart_asgi_in_flight', 'Requests holding a slot on the inference pool.', lambda: app.executor.in_flight))
+
+
+class InferenceExecutor:
+    """Thread pool with a hard cap on running plus queued requests.
+
+    Slots are only taken and returned on the event loop's thread.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.capacity = workers + queue_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        self._in_flight = 0
+        self._waiting = 0
+        self._freed = asyncio.Condition()
+
+    def has_capacity(self):
+        """Whether a new request could claim a slot now.
+
+        Responses already under way and waiting for a slot come first.
+        """
+        return self._in_flight + self._waiting < self.capacity
+
+    def try_acquire(self):
+        """Claims a slot for a new request; False means the queue is full."""
+        if not self.has_capacity():
+            return False
+        self._in_flight += 1
+        return True
+
+    async def acquire(self, timeout=None):
+        """Claims a slot for a new request, waiting up to timeout seconds.
+
+        Returns False if none came free in time.
+        """
+        if self.try_acquire():
+            return True
+        async with self._freed:
+            try:
+                await asyncio.wait_for(self._freed.wait_for(self.has_capacity), timeout)
+            except asyncio.TimeoutError:
+                return False
+            self._in_flight += 1
+            return True
+
+    async def resume(self):
+        """Waits for a slot, for a response that has already started."""
+        async with self._freed:
+            self._waiting += 1
+            try:
+                await self._freed.wait_for(lambda: self._in_flight < self.capacity)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+
+    async def release(self):
+        async with self._freed:
+            self._in_flight -= 1
+            # Wake every waiter: new requests and resuming responses wait for
+            # different conditions, so one woken at random might not proceed.
+            self._freed.notify_all()
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def run(self, context, fn, *args):
+        """Runs fn in the pool inside the request's contextvars context."""
+        return asyncio.get_running_loop().run_in_executor(self._pool, context.run, fn, *args)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+class _Slot:
+    """One request's hold on an executor slot, which it can give up and take back."""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.held = True
+
+    async def acquire(self):
+        await self.executor.resume()
+        self.held = True
+
+    async def release(self):
+        if self.held:
+            self.held = False
+            await self.executor.release()
+
+
+class AsgiApp:
+    """ASGI front end for the Flask app with bounded, back-pressured inference."""
+
+    def __init__(self, wsgi_app, workers=ASGI_WORKERS, queue_size=ASGI_QUEUE):
+        self.wsgi_app = wsgi_app
+        self.executor = InferenceExecutor(workers, queue_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        # Refuse before reading the body, so an overloaded server does not
+        # first take in a large upload only to turn it away. No slot is held
+        # while the body arrives: a slow upload must not block inference.
+        if not self.executor.has_capacity():
+            return await self._reject(send)
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        try:
+            if not await self.executor.acquire(ASGI_ADMIT_WAIT):
+                return await self._reject(send)
+            slot = _Slot(self.executor)
+            try:
+                await self._respond(scope, body, send, slot)
+            finally:
+                await slot.release()
+        finally:
+            body.close()
+
+    async def _reject(self, send):
+        REJECTED_TOTAL.inc()
+        await send({'type': 'http.response.start', 'status': 429,
+                    'headers': [(b'content-type', b'application/json'), (b'retry-after', b'1'),
+                                (b'connection', b'close')]})
+        await send({'type': 'http.response.body', 'body': b'{"error": "Server busy, retry shortly"}'})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        """Receives the whole body into a spooled file; None if the client went away."""
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body
+
+    async def _respond(self, scope, body, send, slot):
+        context = contextvars.copy_context()
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+            return lambda data: response.setdefault('written', []).append(data)
+
+        # Each step that may run Flask code, including pulling the next chunk
+        # of a streamed response, runs on the pool in the same context. The
+        # slot is only held for those steps, not while sending to the client.
+        chunks = await self.executor.run(context, lambda: iter(self.wsgi_app(self._environ(scope, body), start_response)))
+        try:
+            first = await self.executor.run(context, next, chunks, None)
+            await slot.release()
+            await send({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            for data in response.get('written', []):
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+            chunk = first
+            while chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                await slot.acquire()
+                try:
+                    chunk = await self.executor.run(context, next, chunks, None)
+                finally:
+                    await slot.release()
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(chunks, 'close'):
+                await self.executor.run(context, chunks.close)
+
+    @staticmethod
+    def _environ(scope, body):
+        """Builds the WSGI environ for an ASGI HTTP scope."""
+        body.seek(0, os.SEEK_END)
+        length = body.tell()
+        body.seek(0)
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'CONTENT_LENGTH': str(length),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+app = AsgiApp(flask_app.app)
+
+if __name__ == '__main__':
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Serve the heart disease app over ASGI.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, timeout_keep_alive=75)
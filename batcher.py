@@ -0,0 +1,93 @@
+# --- Micro-batching request coalescer ---
+#
+# Concurrent /predict requests hand their feature row to a single background
+# thread, which waits a few milliseconds for more rows, scores them with one
+# model.predict call and hands each label back to its waiting request.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class PredictionBatcher:
+    """Coalesces single-row predictions into batched predict calls."""
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait=0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'total_wait_seconds': 0.0,
+        }
+        self._batch_sizes = {}
+        self._worker = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+        self._worker.start()
+
+    def predict(self, row):
+        """Queues one feature row and blocks until its label is ready."""
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64), time.perf_counter(), future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats['requests'] += 1
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        return future.result()
+
+    def stats(self):
+        """Returns counters for tuning max_batch_size and max_wait."""
+        with self._lock:
+            stats = dict(self._stats)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+        stats['queue_depth'] = self._queue.qsize()
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000
+        stats['batch_sizes'] = batch_sizes
+        stats['mean_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+        stats['mean_wait_ms'] = 1000 * stats.pop('total_wait_seconds') / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def _collect(self):
+        """Blocks for one row, then gathers more until the batch is full or max_wait passes."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            now = time.perf_counter()
+            with self._lock:
+                self._stats['batches'] += 1
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+                self._stats['total_wait_seconds'] += sum(now - queued for _, queued, _ in batch)
+            try:
+                labels = self.predict_fn(np.vstack([row for row, _, _ in batch]))
+                for (_, _, future), label in zip(batch, labels):
+                    future.set_result(label)
+            except Exception:
+                # One bad row must not fail its neighbours; score them singly.
+                for row, _, future in batch:
+                    try:
+                        future.set_result(self.predict_fn(row[None, :])[0])
+                    except Exception as e:
+                        with self._lock:
+                            self._stats['errors'] += 1
+                        future.set_exception(e)
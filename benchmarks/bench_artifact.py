@@ -0,0 +1,142 @@
+# --- Benchmark: pickle vs. memory-mapped artifact start-up ---
+#
+# Loads the model in fresh interpreters the three ways app.py can: from the
+# pickle alone, from the flat artifact written by export_model.py alone, and
+# from both (the artifact for small inputs, the pickle for bulk ones, after
+# checking the artifact was exported from it). It
+# reports cold-start time, resident memory and bulk scoring throughput: the
+# compiled engine is slower than sklearn on large inputs, so an artifact-only
+# deployment starts fastest but scores bulk jobs slowest. It then forks
+# worker processes from each parent, as a pre-forking server would, and
+# reports each worker's private and proportional (shared pages split between
+# processes) memory. Memory figures come from /proc, so they are only
+# available on Linux.
+#
+# Usage: python benchmarks/bench_artifact.py [--workers 4] [--bulk-rows 200000]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FEATURES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+
+def memory_kib():
+    """Returns {'rss', 'pss', 'private'} in KiB for this process, or {} off Linux."""
+    fields = {'Rss:': 'rss', 'Pss:': 'pss', 'Private_Clean:': 'private', 'Private_Dirty:': 'private'}
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in fields:
+                    key = fields[parts[0]]
+                    usage[key] = usage.get(key, 0) + int(parts[1])
+    except OSError:
+        pass
+    return usage
+
+
+def child(mode, artifact, workers, bulk_rows):
+    """Runs inside a fresh interpreter and prints one JSON result line."""
+    warnings.filterwarnings('ignore')
+    import numpy as np
+    import pandas as pd
+    X = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[FEATURES].to_numpy()
+    if mode != 'artifact':
+        import pickle
+        import sklearn.ensemble  # noqa: F401  (import cost is not load cost)
+    if mode != 'pickle':
+        from forest_engine import CompiledForest, source_fingerprint
+    before = memory_kib()
+
+    # model is what app.py scores bulk inputs with in this mode.
+    start = time.perf_counter()
+    if mode != 'pickle':
+        model = CompiledForest.load(artifact)
+    if mode != 'artifact':
+        with open(os.path.join(ROOT, 'random_forest_heart_model.pkl'), 'rb') as f:
+            data = f.read()
+        # app.py checks the pickle against the artifact before pairing them.
+        if mode == 'both' and source_fingerprint(data, model.n_estimators) != model.source:
+            raise SystemExit('Error: artifact was not exported from this pickle.')
+        model = pickle.loads(data)
+    load_seconds = time.perf_counter() - start
+    model.predict(X[:1])
+    after = memory_kib()
+
+    bulk = np.resize(X, (bulk_rows, X.shape[1]))
+    start = time.perf_counter()
+    model.predict(bulk)
+    bulk_seconds = time.perf_counter() - start
+
+    # Fork workers that each score the whole file, then report their memory.
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            model.predict(X)
+            os.write(write_fd, (json.dumps(memory_kib()) + '\n').encode())
+            os._exit(0)
+        pids.append(pid)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        worker_usage = [json.loads(line) for line in pipe]
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    print(json.dumps({
+        'load_seconds': load_seconds,
+        'rss_delta_kib': after.get('rss', 0) - before.get('rss', 0),
+        'bulk_rows_per_sec': bulk_rows / bulk_seconds,
+        'worker_pss_kib': float(np.mean([u.get('pss', 0) for u in worker_usage])) if worker_usage else 0,
+        'worker_private_kib': float(np.mean([u.get('private', 0) for u in worker_usage])) if worker_usage else 0,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare pickle and artifact start-up cost.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--bulk-rows', type=int, default=200000, help='rows scored in one call for the bulk column')
+    parser.add_argument('--child', choices=['pickle', 'artifact', 'both'], help=argparse.SUPPRESS)
+    parser.add_argument('--artifact', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.artifact, args.workers, args.bulk_rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, 'model.rfn')
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'export_model.py'), '--output', artifact],
+            cwd=ROOT, check=True, capture_output=True,
+        )
+        print(f"pickle {os.path.getsize(os.path.join(ROOT, 'random_forest_heart_model.pkl')) / 1024:.0f} KiB, "
+              f"artifact {os.path.getsize(artifact) / 1024:.0f} KiB, {args.workers} forked workers")
+        print(f"{'source':<10}{'load ms':>10}{'RSS +KiB':>10}{'bulk rows/s':>13}{'worker PSS KiB':>16}{'worker private KiB':>20}")
+        for mode in ('pickle', 'artifact', 'both'):
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', mode,
+                     '--artifact', artifact, '--workers', str(args.workers), '--bulk-rows', str(args.bulk_rows)],
+                    check=True, capture_output=True, text=True,
+                )
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            best = min(runs, key=lambda r: r['load_seconds'])
+            print(f"{mode:<10}{best['load_seconds'] * 1000:>10.1f}{best['rss_delta_kib']:>10}{best['bulk_rows_per_sec']:>13.0f}"
+                  f"{best['worker_pss_kib']:>16.0f}{best['worker_private_kib']:>20.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# --- Benchmark: micro-batching under concurrent load ---
+#
+# Runs N client threads that each score single rows, first calling the model
+# directly and then through PredictionBatcher, and reports requests/second,
+# p50/p99 latency and the batcher's own statistics.
+#
+# Usage: python benchmarks/bench_batching.py [--threads 32] [--requests 200]
+
+import argparse
+import os
+import pickle
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batcher import PredictionBatcher  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+
+FEATURES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+
+def run_load(score_row, rows, threads, per_thread):
+    """Returns (requests/sec, latencies in ms) for concurrent single-row scoring."""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(seed):
+        local = []
+        for i in range(per_thread):
+            row = rows[(seed * per_thread + i) % len(rows)]
+            start = time.perf_counter()
+            score_row(row)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare direct and micro-batched /predict scoring.')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--sklearn', action='store_true', help='score with model.predict instead of CompiledForest')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with open(os.path.join(ROOT, 'random_forest_heart_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    predictor = model if args.sklearn else CompiledForest.from_model(model)
+    rows = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[FEATURES].to_numpy(dtype=np.float64)
+
+    batcher = PredictionBatcher(predictor.predict, args.max_batch_size, args.max_wait_ms / 1000)
+    modes = {
+        'direct': lambda row: predictor.predict([row])[0],
+        'batched': batcher.predict,
+    }
+    print(f"{args.threads} threads x {args.requests} requests, predictor={type(predictor).__name__}")
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, score_row in modes.items():
+        rps, latencies = run_load(score_row, rows, args.threads, args.requests)
+        print(f"{name:<10}{rps:>10.0f}{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 99):>10.2f}")
+    stats = batcher.stats()
+    print(f"batcher: mean batch size {stats['mean_batch_size']:.1f}, "
+          f"max queue depth {stats['max_queue_depth']}, mean wait {stats['mean_wait_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
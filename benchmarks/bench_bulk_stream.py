@@ -0,0 +1,77 @@
+# --- Benchmark: buffered vs. streaming /bulk_predict ---
+#
+# Writes CSV files of increasing size by resampling heart.txt, posts each one
+# to /bulk_predict through the Flask test client in both modes and reports
+# time to first byte, total time and peak Python heap (tracemalloc) while the
+# response is produced.
+#
+# Usage: python benchmarks/bench_bulk_stream.py [--rows 10000 100000 1000000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import app as heart_app  # noqa: E402
+
+
+def write_sample(path, n_rows):
+    """Writes n_rows rows resampled from heart.txt to path."""
+    base = pd.read_csv(os.path.join(ROOT, 'heart.txt'))
+    rng = np.random.default_rng(0)
+    base.iloc[rng.integers(0, len(base), n_rows)].to_csv(path, index=False)
+
+
+def run(client, path, stream):
+    """Posts path to /bulk_predict and drains the response chunk by chunk."""
+    with open(path, 'rb') as f:
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.post(
+            f"/bulk_predict?stream={int(stream)}",
+            data={'bulk_file': (f, 'sample.csv')},
+            buffered=False,
+        )
+        first_byte = None
+        total = 0
+        for piece in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            total += len(piece)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        response.close()
+    return first_byte, elapsed, peak, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare buffered and streaming bulk prediction.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    client = heart_app.app.test_client()
+    print(f"{'rows':>10} {'mode':<10}{'first byte s':>14}{'total s':>10}{'peak MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f"{n_rows}.csv")
+            write_sample(path, n_rows)
+            for stream in (False, True):
+                first_byte, elapsed, peak, _ = run(client, path, stream)
+                mode = 'stream' if stream else 'buffered'
+                print(f"{n_rows:>10} {mode:<10}{first_byte:>14.3f}{elapsed:>10.3f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
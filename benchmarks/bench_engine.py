@@ -0,0 +1,63 @@
+# --- Benchmark: compiled forest vs. sklearn predict ---
+#
+# Checks that CompiledForest reproduces model.predict / predict_proba exactly
+# on heart.txt, then compares single-row and full-file latency.
+#
+# Usage: python benchmarks/bench_engine.py [--repeat N]
+
+import argparse
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from forest_engine import CompiledForest  # noqa: E402
+
+FEATURES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+
+def time_per_call(fn, repeat):
+    """Returns the median wall time of fn() in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare CompiledForest with sklearn predict.')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with open(os.path.join(ROOT, 'random_forest_heart_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    engine = CompiledForest.from_model(model)
+
+    X = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[FEATURES].to_numpy()
+    assert np.array_equal(engine.predict(X), model.predict(X)), "label mismatch"
+    assert np.array_equal(engine.predict_proba(X), model.predict_proba(X)), "probability mismatch"
+    print(f"Outputs match model.predict bit-for-bit on {len(X)} rows.")
+
+    row = [np.array(X[0])]
+    sk_row = time_per_call(lambda: model.predict(row), args.repeat)
+    cf_row = time_per_call(lambda: engine.predict(row), args.repeat)
+    sk_all = time_per_call(lambda: model.predict(X), max(args.repeat // 10, 3))
+    cf_all = time_per_call(lambda: engine.predict(X), max(args.repeat // 10, 3))
+
+    print(f"{'':<22}{'sklearn':>12}{'compiled':>12}{'speedup':>10}")
+    print(f"{'single row (us)':<22}{sk_row:>12.1f}{cf_row:>12.1f}{sk_row / cf_row:>9.1f}x")
+    print(f"{f'{len(X)} rows (us)':<22}{sk_all:>12.1f}{cf_all:>12.1f}{sk_all / cf_all:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# --- Benchmark: /bulk_predict end-to-end cost per upload format ---
+#
+# Resamples heart.txt up to each requested size, encodes it as CSV, Parquet,
+# Arrow IPC and a float32 .npy matrix, and posts each upload to /bulk_predict
+# through the Flask test client. Every (format, size) pair runs in a fresh
+# interpreter so peak RSS (which covers pyarrow's allocations, unlike
+# tracemalloc) belongs to that request alone.
+#
+# Usage: python benchmarks/bench_formats.py [--rows 100000 1000000 5000000]
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FORMATS = {'csv': 'sample.csv', 'parquet': 'sample.parquet', 'arrow': 'sample.arrow', 'npy': 'sample.npy'}
+
+
+def rss_kib():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def encode(df, fmt, columns):
+    """Returns the upload body for df in the given format."""
+    import numpy as np
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode()
+    if fmt == 'npy':
+        output = io.BytesIO()
+        np.save(output, df[columns].to_numpy(dtype=np.float32))
+        return output.getvalue()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == 'parquet':
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def child(fmt, n_rows):
+    """Times one upload in this interpreter and prints a JSON result line."""
+    warnings.filterwarnings('ignore')
+    os.chdir(ROOT)
+    import numpy as np
+    import pandas as pd
+    import app as heart_app
+
+    base = pd.read_csv(os.path.join(ROOT, 'heart.txt'))
+    rng = np.random.default_rng(0)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    body = encode(df, fmt, heart_app.REQUIRED_COLUMNS)
+    del df
+    client = heart_app.app.test_client()
+    before = rss_kib()
+
+    start = time.perf_counter()
+    response = client.post('/bulk_predict', data={'bulk_file': (io.BytesIO(body), FORMATS[fmt])})
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.data[:200]
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'seconds': elapsed,
+        'upload_bytes': len(body),
+        'response_bytes': len(response.data),
+        'peak_rss_over_baseline_kib': max(peak - before, 0),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare /bulk_predict cost across upload formats.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000, 5000000])
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child[0], int(args.child[1]))
+
+    print(f"{'rows':>10} {'format':<9}{'upload MiB':>12}{'seconds':>10}{'rows/s':>12}{'peak +MiB':>11}")
+    for n_rows in args.rows:
+        for fmt in args.formats:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', fmt, str(n_rows)],
+                capture_output=True, text=True,
+            )
+            if out.returncode:
+                print(f"{n_rows:>10} {fmt:<9} failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{n_rows:>10} {fmt:<9}{result['upload_bytes'] / 2**20:>12.1f}{result['seconds']:>10.2f}"
+                  f"{n_rows / result['seconds']:>12.0f}{result['peak_rss_over_baseline_kib'] / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# --- Benchmark: bulk scoring throughput vs. worker count ---
+#
+# Scores a matrix resampled from heart.txt with ParallelScorer at increasing
+# worker counts and reports rows/sec and speed-up over one worker.
+#
+# Usage: python benchmarks/bench_parallel.py [--rows 1000000] [--workers 1 2 4 8]
+
+import argparse
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parallel import ParallelScorer  # noqa: E402
+
+FEATURES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < cores], cores})
+    parser = argparse.ArgumentParser(description='Measure bulk scoring throughput against worker count.')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--partition-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with open(os.path.join(ROOT, 'random_forest_heart_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    base = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[FEATURES]
+    rng = np.random.default_rng(0)
+    X = base.iloc[rng.integers(0, len(base), args.rows)].reset_index(drop=True)
+
+    expected = None
+    baseline = None
+    print(f"{args.rows} rows on {cores} cores")
+    print(f"{'workers':>8}{'rows/s':>14}{'speedup':>10}")
+    for workers in args.workers:
+        scorer = ParallelScorer(model, workers, args.partition_rows)
+        start = time.perf_counter()
+        labels = scorer.predict(X)
+        elapsed = time.perf_counter() - start
+        scorer.shutdown()
+        if expected is None:
+            expected = labels
+        assert np.array_equal(labels, expected), "partitioned results differ"
+        rate = args.rows / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>14.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,418 @@
+# --- Reproducible load and benchmark suite for the serving paths ---
+#
+# Synthesizes patients that follow the distribution of heart.txt and measures
+#   single     sequential /predict latency
+#   concurrent /predict throughput and latency from many client threads
+#   bulk       /bulk_predict throughput for CSV uploads from 1K to 10M rows
+# against the app in-process (Flask test client), a local server this script
+# starts, or an already running server. Results are written as JSON; with
+# --compare they are checked against a saved baseline and any metric that
+# got worse by more than --tolerance is reported as a regression (exit 1).
+# A run in which any request failed exits 1 as well, and its timings are not
+# compared: an error returned early must not pass for a speed-up.
+#
+# Usage:
+#   python benchmarks/suite.py --output baseline.json
+#   python benchmarks/suite.py --compare baseline.json --output current.json
+#   python benchmarks/suite.py --target local --quick
+#   python benchmarks/suite.py --url http://127.0.0.1:5000
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FEATURES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+# Continuous features get jitter on top of bootstrapped rows; the rest are codes.
+CONTINUOUS = {'age': 1.0, 'trestbps': 4.0, 'chol': 10.0, 'thalach': 5.0, 'oldpeak': 0.2}
+
+# For --compare: whether a larger value of each metric is better.
+HIGHER_IS_BETTER = {'requests_per_sec': True, 'rows_per_sec': True}
+
+
+# --- Workload synthesis ---
+
+class PatientSampler:
+    """Draws realistic patients by bootstrapping heart.txt rows and jittering continuous features."""
+
+    def __init__(self, seed=0):
+        self.base = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[FEATURES]
+        self.low = self.base.min()
+        self.high = self.base.max()
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, n):
+        df = self.base.iloc[self.rng.integers(0, len(self.base), n)].reset_index(drop=True)
+        for col, scale in CONTINUOUS.items():
+            jittered = (df[col] + self.rng.normal(0, scale, n)).clip(self.low[col], self.high[col])
+            df[col] = jittered.round(1) if col == 'oldpeak' else jittered.round().astype(np.int64)
+        return df
+
+    def write_csv(self, path, n, chunk=1000000):
+        """Writes n sampled rows to path in chunks so 10M-row files need little memory."""
+        with open(path, 'w') as f:
+            for start in range(0, n, chunk):
+                self.sample(min(chunk, n - start)).to_csv(f, index=False, header=start == 0)
+
+
+# --- Clients ---
+
+def summarize_body(blocks):
+    """Returns (bytes, lines, last line) of a response body, read block by block.
+
+    Only the tail is kept, so a multi-gigabyte result is never held in memory.
+    """
+    size, lines, tail = 0, 0, b''
+    for block in blocks:
+        size += len(block)
+        lines += block.count(b'\n')
+        tail = (tail + block[-4096:])[-4096:]
+    last_line = tail.rstrip(b'\r\n').rsplit(b'\n', 1)[-1].decode('utf-8', 'replace')
+    return size, lines, last_line
+
+
+class InProcessClient:
+    """Calls the Flask app directly through its test client."""
+
+    def __init__(self):
+        warnings.filterwarnings('ignore')
+        os.chdir(ROOT)
+        import app as heart_app
+        self.app = heart_app.app
+
+    def post_json(self, path, payload):
+        response = self.app.test_client().post(path, json=payload)
+        return response.status_code, response.data
+
+    def post_file(self, path, filename, file):
+        response = self.app.test_client().post(path, data={'bulk_file': (file, filename)}, buffered=False)
+        summary = summarize_body(response.iter_encoded())
+        response.close()
+        return response.status_code, summary
+
+    def peak_rss_kib(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class HttpClient:
+    """Calls a running server over HTTP using only the standard library."""
+
+    def __init__(self, url, pid=None):
+        self.url = url.rstrip('/')
+        self.pid = pid
+
+    def _send(self, request):
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, summarize_body(iter(lambda: response.read(1 << 20), b''))
+        except urllib.error.HTTPError as e:
+            return e.code, summarize_body([e.read()])
+
+    def post_json(self, path, payload):
+        request = urllib.request.Request(
+            self.url + path, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+        status, (size, _, _) = self._send(request)
+        return status, size
+
+    def post_file(self, path, filename, file):
+        boundary = uuid.uuid4().hex
+        head = (f'--{boundary}\r\nContent-Disposition: form-data; name="bulk_file"; filename="{filename}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        file.seek(0, os.SEEK_END)
+        length = len(head) + file.tell() + len(tail)
+        file.seek(0)
+
+        def body():
+            yield head
+            while True:
+                block = file.read(1 << 20)
+                if not block:
+                    break
+                yield block
+            yield tail
+
+        request = urllib.request.Request(self.url + path, data=body(), headers={
+            'Content-Type': f'multipart/form-data; boundary={boundary}', 'Content-Length': str(length)})
+        return self._send(request)
+
+    def peak_rss_kib(self):
+        """Peak RSS of the server process, when this script started it."""
+        if not self.pid:
+            return None
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+
+def start_local_server():
+    """Starts the app on a free port in a threaded server. Returns (process, url)."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    code = ("import warnings; warnings.filterwarnings('ignore'); import app; "
+            "from werkzeug.serving import run_simple; "
+            f"run_simple('127.0.0.1', {port}, app.app, threaded=True)")
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + '/metrics').close()
+            return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('Local server did not start within 60 seconds.')
+
+
+# --- Scenarios ---
+
+def latency_summary(latencies_ms):
+    latencies_ms = np.asarray(latencies_ms)
+    return {
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(latencies_ms.mean()),
+    }
+
+
+def run_single(client, sampler, n_requests, warmup=20):
+    payloads = sampler.sample(n_requests + warmup).to_dict(orient='records')
+    for payload in payloads[:warmup]:
+        client.post_json('/predict', payload)
+    latencies, errors = [], 0
+    for payload in payloads[warmup:]:
+        start = time.perf_counter()
+        status, _ = client.post_json('/predict', payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += status != 200
+    return {'requests': n_requests, 'errors': errors, **latency_summary(latencies)}
+
+
+def run_concurrent(client, sampler, threads, per_thread):
+    payloads = sampler.sample(threads * per_thread).to_dict(orient='records')
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(offset):
+        local, failed = [], 0
+        for payload in payloads[offset:offset + per_thread]:
+            start = time.perf_counter()
+            status, _ = client.post_json('/predict', payload)
+            local.append((time.perf_counter() - start) * 1000)
+            failed += status != 200
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    workers = [threading.Thread(target=worker, args=(n * per_thread,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return {'threads': threads, 'requests': len(latencies), 'errors': errors[0],
+            'requests_per_sec': len(latencies) / elapsed, **latency_summary(latencies)}
+
+
+def run_bulk(client, sampler, n_rows, stream, tmp):
+    path = os.path.join(tmp, f'bulk_{n_rows}.csv')
+    sampler.write_csv(path, n_rows)
+    with open(path, 'rb') as f:
+        start = time.perf_counter()
+        status, (response_bytes, lines, last_line) = client.post_file(f'/bulk_predict?stream={int(stream)}', 'bulk.csv', f)
+        elapsed = time.perf_counter() - start
+    upload_bytes = os.path.getsize(path)
+    os.remove(path)
+    result = {'rows': n_rows, 'status': status, 'seconds': elapsed,
+              'upload_bytes': upload_bytes, 'response_bytes': response_bytes}
+    # A streamed response that fails after its first chunk still has status
+    # 200; it ends with a marker line instead of the remaining rows.
+    if last_line.startswith('# An error occurred'):
+        result['error'] = last_line[2:]
+        lines -= 1
+    result['rows_returned'] = max(lines - 1, 0)
+    if status == 200 and 'error' not in result and result['rows_returned'] == n_rows:
+        result['rows_per_sec'] = n_rows / elapsed
+    return result
+
+
+# --- Comparison ---
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def failures(results):
+    """Returns {scenario key: description} for every scenario with failed requests."""
+    failed = {}
+    for scenario in ('single', 'concurrent'):
+        r = results.get(scenario)
+        if r and r['errors']:
+            failed[scenario] = f"{scenario}: {r['errors']} of {r['requests']} requests failed"
+    for n_rows, r in results.get('bulk', {}).items():
+        if r['status'] != 200:
+            failed[f'bulk.{n_rows}'] = f"bulk {n_rows} rows: status {r['status']}"
+        elif r.get('error'):
+            failed[f'bulk.{n_rows}'] = f"bulk {n_rows} rows: {r['error']} (after {r['rows_returned']} rows)"
+        elif r.get('rows_returned', r['rows']) != r['rows']:
+            failed[f'bulk.{n_rows}'] = f"bulk {n_rows} rows: only {r['rows_returned']} rows returned"
+    return failed
+
+
+def compare(current, baseline, tolerance):
+    """Returns a list of (metric, baseline, current, change) for regressions beyond tolerance.
+
+    Scenarios with failed requests in either run are skipped; failures() reports them.
+    """
+    regressions = []
+    now, before = flatten(current['results']), flatten(baseline['results'])
+    skipped = tuple(f'{key}.' for key in {**failures(current['results']), **failures(baseline['results'])})
+    for name, old in before.items():
+        metric = name.rsplit('.', 1)[-1]
+        if name not in now or not old or name.startswith(skipped) or not (
+                metric.endswith('_ms') or metric.endswith('_kib') or metric in ('seconds', *HIGHER_IS_BETTER)):
+            continue
+        change = (now[name] - old) / old
+        worse = -change if HIGHER_IS_BETTER.get(metric) else change
+        if worse > tolerance:
+            regressions.append((name, old, now[name], change))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the /predict and /bulk_predict serving paths.')
+    parser.add_argument('--target', choices=['inprocess', 'local'], default='inprocess',
+                        help="call the app in-process, or start a local threaded server")
+    parser.add_argument('--url', help='benchmark an already running server instead')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--single-requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--per-thread', type=int, default=100)
+    parser.add_argument('--bulk-rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000, 10000000])
+    parser.add_argument('--bulk-buffered', action='store_true', help='upload without ?stream=1')
+    parser.add_argument('--quick', action='store_true', help='small run for smoke testing')
+    parser.add_argument('--scenarios', nargs='+', choices=['single', 'concurrent', 'bulk'],
+                        default=['single', 'concurrent', 'bulk'])
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed relative slowdown (default 10%%)')
+    args = parser.parse_args()
+    if args.quick:
+        args.single_requests, args.threads, args.per_thread, args.bulk_rows = 100, 4, 25, [1000, 10000]
+
+    server = None
+    if args.url:
+        client, target = HttpClient(args.url), args.url
+    elif args.target == 'local':
+        server, url = start_local_server()
+        client, target = HttpClient(url, server.pid), url
+    else:
+        client, target = InProcessClient(), 'inprocess'
+
+    sampler = PatientSampler(args.seed)
+    results = {}
+    try:
+        if 'single' in args.scenarios:
+            results['single'] = run_single(client, sampler, args.single_requests)
+            print(f"single      p50 {results['single']['p50_ms']:.2f} ms  p99 {results['single']['p99_ms']:.2f} ms")
+        if 'concurrent' in args.scenarios:
+            results['concurrent'] = run_concurrent(client, sampler, args.threads, args.per_thread)
+            r = results['concurrent']
+            print(f"concurrent  {r['requests_per_sec']:.0f} req/s  p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms")
+        if 'bulk' in args.scenarios:
+            results['bulk'] = {}
+            with tempfile.TemporaryDirectory() as tmp:
+                for n_rows in args.bulk_rows:
+                    r = run_bulk(client, sampler, n_rows, not args.bulk_buffered, tmp)
+                    results['bulk'][str(n_rows)] = r
+                    rate = f"{r['rows_per_sec']:.0f} rows/s" if 'rows_per_sec' in r else 'failed'
+                    print(f"bulk {n_rows:>9} rows  {r['seconds']:.2f} s  {rate}  status {r['status']}")
+        peak = client.peak_rss_kib()
+        if peak is not None:
+            results['peak_rss_kib'] = peak
+            print(f"peak RSS    {peak / 1024:.1f} MiB")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'target': target,
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    failed = failures(results)
+    for description in failed.values():
+        print(f"FAILED {description}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for key in ('target', 'cpus', 'python'):
+            if baseline['meta'].get(key) != report['meta'][key]:
+                print(f"Warning: baseline {key} {baseline['meta'].get(key)!r} differs from {report['meta'][key]!r}.")
+        for description in failures(baseline['results']).values():
+            print(f"Warning: baseline has failures, not compared: {description}")
+        regressions = compare(report, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+        if regressions or failed:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}.")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
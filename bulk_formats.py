@@ -0,0 +1,100 @@
+# --- Columnar binary formats for /bulk_predict ---
+#
+# Parquet and Arrow IPC uploads are read with pyarrow (an optional
+# dependency, only needed for those formats); raw .npy matrices need only
+# NumPy. Results go back in the format they arrived in: Parquet and Arrow
+# tables gain a 'prediction' column, and a .npy matrix is answered with a
+# .npy vector of labels.
+
+import io
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Upload file extensions and the format each one selects.
+BULK_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.arrows': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.npy': 'npy',
+}
+
+_RESULTS = {
+    'parquet': ('application/vnd.apache.parquet', 'predictions.parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'predictions.arrow'),
+    'arrow-stream': ('application/vnd.apache.arrow.stream', 'predictions.arrows'),
+    'npy': ('application/octet-stream', 'predictions.npy'),
+}
+
+_ARROW_FILE_MAGIC = b'ARROW1'
+
+
+def bulk_format(filename):
+    """Returns the format name for an upload's file name, or None if unsupported."""
+    for extension, name in BULK_FORMATS.items():
+        if filename.lower().endswith(extension):
+            return name
+    return None
+
+
+def read_upload(stream, fmt):
+    """Reads a Parquet, Arrow IPC or .npy upload.
+
+    Returns (data, fmt) where data is a pyarrow Table (or an ndarray for .npy)
+    and fmt distinguishes the Arrow IPC file and stream flavours so the reply
+    can use the same one.
+    """
+    if fmt == 'npy':
+        return np.load(stream, allow_pickle=False), fmt
+    if pa is None:
+        raise ImportError("Parquet and Arrow uploads require the 'pyarrow' package.")
+    source = pa.PythonFile(stream, mode='r')
+    if fmt == 'parquet':
+        return pq.read_table(source), fmt
+    if stream.read(len(_ARROW_FILE_MAGIC)) == _ARROW_FILE_MAGIC:
+        stream.seek(0)
+        return pa.ipc.open_file(source).read_all(), 'arrow'
+    stream.seek(0)
+    return pa.ipc.open_stream(source).read_all(), 'arrow-stream'
+
+
+def feature_matrix(table, columns):
+    """Copies the named table columns into one float32 (rows, features) matrix.
+
+    Each Arrow chunk is viewed in place and written straight into its slot,
+    so the only copy is the one into the matrix the model scores, already in
+    the float32 layout the forest compares.
+    """
+    X = np.empty((table.num_rows, len(columns)), dtype=np.float32)
+    for i, name in enumerate(columns):
+        position = 0
+        for chunk in table.column(name).chunks:
+            X[position:position + len(chunk), i] = chunk.to_numpy(zero_copy_only=False)
+            position += len(chunk)
+    return X
+
+
+def write_result(data, labels, fmt):
+    """Serializes predictions in the upload's format. Returns (body, mimetype, filename)."""
+    mimetype, filename = _RESULTS[fmt]
+    if fmt == 'npy':
+        output = io.BytesIO()
+        np.save(output, np.asarray(labels), allow_pickle=False)
+        return output.getvalue(), mimetype, filename
+    table = data.append_column('prediction', pa.array(labels))
+    sink = pa.BufferOutputStream()
+    if fmt == 'parquet':
+        pq.write_table(table, sink)
+    else:
+        new_writer = pa.ipc.new_file if fmt == 'arrow' else pa.ipc.new_stream
+        with new_writer(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes(), mimetype, filename
@@ -0,0 +1,241 @@
+# --- Build compact variants of the forest and report what they cost ---
+#
+# Usage: python compact_model.py [--model random_forest_heart_model.pkl] [--data heart.txt]
+#                                [--output-dir compact] [--variant trees=25,depth=6,precision=float32 ...]
+#
+# Each variant is the full forest with any of these applied:
+#   trees=N          keep only the first N trees
+#   depth=D          cut every tree at depth D; the cut nodes become leaves
+#                    predicting their training class mix
+#   precision=P      store thresholds and leaf values as float32 or float16
+#   early_exit       stop walking trees once the remaining ones cannot change
+#                    the label (never changes a label by itself)
+#
+# Every variant is written as an artifact to --output-dir, then reloaded from
+# it and scored on --data. The report gives accuracy, agreement with the full
+# forest, artifact size, and latency per row alone and in bulk. To deploy one, point
+# HEART_MODEL_ARTIFACT at its .rfn file.
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+DEFAULT_VARIANTS = (
+    'baseline',
+    'precision=float32',
+    'precision=float16',
+    'early_exit',
+    'trees=50',
+    'trees=25',
+    'trees=10',
+    'depth=8',
+    'depth=6',
+    'depth=4',
+    'trees=50,depth=8,precision=float32,early_exit',
+)
+PRECISIONS = {'float32': np.float32, 'float16': np.float16}
+
+
+def parse_variant(spec):
+    """Turns 'trees=25,early_exit' into {'trees': 25, 'early_exit': True}."""
+    options = {}
+    for part in spec.split(','):
+        name, _, value = part.strip().partition('=')
+        if name == 'baseline':
+            continue
+        if name in ('trees', 'depth'):
+            options[name] = int(value)
+        elif name == 'precision' and value in PRECISIONS:
+            options[name] = value
+        elif name == 'early_exit' and not value:
+            options[name] = True
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown variant option '{part}' in '{spec}'.")
+    return options
+
+
+def variant_name(options):
+    """Turns {'trees': 25, 'early_exit': True} into 'trees25-early-exit'."""
+    parts = [f"trees{options['trees']}" if 'trees' in options else None,
+             f"depth{options['depth']}" if 'depth' in options else None,
+             options.get('precision'),
+             'early-exit' if options.get('early_exit') else None]
+    return '-'.join(part for part in parts if part) or 'baseline'
+
+
+def _replace(forest, **changes):
+    """Copies forest with some of its node tables or settings replaced."""
+    fields = {name: getattr(forest, name) for name in (
+        'feature', 'threshold', 'left', 'right', 'value', 'roots', 'max_depth', 'early_exit', 'missing_left')}
+    fields.update(changes)
+    replaced = CompiledForest(classes=forest.classes_, **fields)
+    replaced.n_features_in_ = forest.n_features_in_
+    return replaced
+
+
+def _keep_nodes(forest, keep):
+    """Copies forest with only the nodes in the keep mask, renumbered.
+
+    Every kept node's children must be kept too (or be the node itself, as
+    for leaves).
+    """
+    new_index = np.cumsum(keep) - 1
+    return _replace(
+        forest,
+        feature=forest.feature[keep],
+        threshold=forest.threshold[keep],
+        left=new_index[forest.left[keep]],
+        right=new_index[forest.right[keep]],
+        value=np.ascontiguousarray(forest.value[keep]),
+        missing_left=None if forest.missing_left is None else forest.missing_left[keep],
+        roots=new_index[forest.roots[keep[forest.roots]]],
+    )
+
+
+def first_trees(forest, n_trees):
+    """Keeps the first n_trees trees. Their nodes come first in the tables."""
+    if not 0 < n_trees <= forest.n_estimators:
+        raise SystemExit(f"Error: trees must be between 1 and {forest.n_estimators}.")
+    end = forest.roots[n_trees] if n_trees < forest.n_estimators else len(forest.feature)
+    return _keep_nodes(forest, np.arange(len(forest.feature)) < end)
+
+
+def node_depths(forest):
+    """Returns the depth of every node, counting roots as depth 0."""
+    depth = np.zeros(len(forest.feature), dtype=np.int64)
+    frontier = forest.roots
+    level = 0
+    while len(frontier):
+        frontier = frontier[forest.left[frontier] != frontier]
+        frontier = np.concatenate((forest.left[frontier], forest.right[frontier]))
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+def cap_depth(forest, max_depth):
+    """Cuts every tree at max_depth, turning the nodes there into leaves.
+
+    A new leaf predicts the class mix stored on the node it replaces, i.e.
+    that of the training samples which reached it.
+    """
+    if max_depth >= forest.max_depth:
+        return forest
+    depth = node_depths(forest)
+    cut = np.flatnonzero((depth == max_depth) & (forest.left != np.arange(len(depth))))
+    feature, threshold, left, right = forest.feature.copy(), forest.threshold.copy(), forest.left.copy(), forest.right.copy()
+    feature[cut] = 0
+    threshold[cut] = np.inf
+    left[cut] = cut
+    right[cut] = cut
+    truncated = _replace(forest, feature=feature, threshold=threshold, left=left, right=right, max_depth=max_depth)
+    return _keep_nodes(truncated, depth <= max_depth)
+
+
+def round_down(values, dtype):
+    """Casts values to dtype, rounding each toward -inf instead of to nearest.
+
+    Features are compared as float32, so for any feature value x,
+    x <= t exactly when x <= round_down(t, float32): float32 thresholds lose
+    nothing. float16 ones can send a row the other way when x falls between
+    t and its rounded value.
+    """
+    narrowed = values.astype(dtype)
+    above = narrowed > values
+    narrowed[above] = np.nextafter(narrowed[above], dtype(-np.inf))
+    return narrowed
+
+
+def set_precision(forest, precision):
+    """Stores thresholds and leaf values as float32 or float16.
+
+    Node and feature indices stay 64-bit: NumPy converts narrower index
+    arrays on every fancy-indexing step, which costs more time per row than
+    the smaller tables save.
+    """
+    dtype = PRECISIONS[precision]
+    return _replace(forest, threshold=round_down(forest.threshold, dtype), value=forest.value.astype(dtype))
+
+
+def build_variant(forest, options):
+    """Applies one variant's options to the full forest."""
+    if 'trees' in options:
+        forest = first_trees(forest, options['trees'])
+    if 'depth' in options:
+        forest = cap_depth(forest, options['depth'])
+    if 'precision' in options:
+        forest = set_precision(forest, options['precision'])
+    if options.get('early_exit'):
+        forest = _replace(forest, early_exit=True)
+    return forest
+
+
+def row_latency(forest, X, repeat):
+    """Median seconds for forest.predict on one row, over rows of X."""
+    timings = []
+    for _ in range(repeat):
+        for row in X:
+            start = time.perf_counter()
+            forest.predict(row[None, :])
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def bulk_latency(forest, X, repeat):
+    """Best seconds per row for forest.predict on all of X at once."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        forest.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return best / len(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build compact forest variants and report accuracy, size and latency.')
+    parser.add_argument('--model', default='random_forest_heart_model.pkl')
+    parser.add_argument('--data', default='heart.txt', help="CSV with the model's features and a 'target' column")
+    parser.add_argument('--output-dir', default='compact')
+    parser.add_argument('--variant', dest='variants', type=parse_variant, action='append',
+                        help='comma-separated options, e.g. trees=25,depth=6 (repeatable; default: a sweep of each option)')
+    parser.add_argument('--latency-rows', type=int, default=200, help='rows timed one at a time per variant')
+    parser.add_argument('--bulk-rows', type=int, default=20000, help='rows timed in one predict() call per variant')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import pandas as pd
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    df = pd.read_csv(args.data)
+    X = df[list(model.feature_names_in_)] if hasattr(model, 'feature_names_in_') else df.iloc[:, :model.n_features_in_]
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = df['target'].to_numpy()
+    sample = X[:args.latency_rows]
+    bulk = np.resize(X, (args.bulk_rows, X.shape[1]))
+
+    full = CompiledForest.from_model(model)
+    reference = full.predict(X)
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"{args.model}: {os.path.getsize(args.model) / 1024:.0f} KiB, {full.n_estimators} trees, "
+          f"{len(full.feature)} nodes, accuracy {np.mean(reference == y):.4f} on {args.data}")
+    print(f"{'variant':<32}{'trees':>6}{'nodes':>8}{'accuracy':>10}{'agree':>8}{'size KiB':>10}{'row us':>9}{'bulk us/row':>13}")
+    for options in args.variants or [parse_variant(spec) for spec in DEFAULT_VARIANTS]:
+        name = variant_name(options)
+        path = os.path.join(args.output_dir, f"{name}.rfn")
+        build_variant(full, options).save(path)
+        # Measure the artifact as it would be served: memory-mapped from disk.
+        variant = CompiledForest.load(path)
+        labels = variant.predict(X)
+        print(f"{name:<32}{variant.n_estimators:>6}{len(variant.feature):>8}{np.mean(labels == y):>10.4f}"
+              f"{np.mean(labels == reference):>8.3f}{os.path.getsize(path) / 1024:>10.1f}"
+              f"{row_latency(variant, sample, args.repeat) * 1e6:>9.1f}{bulk_latency(variant, bulk, args.repeat) * 1e6:>13.2f}")
+    print(f"Artifacts written to {args.output_dir}/; point HEART_MODEL_ARTIFACT at one to serve it.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# --- Export the pickled forest to a flat, memory-mappable artifact ---
+#
+# Usage: python export_model.py [--model random_forest_heart_model.pkl] [--output random_forest_heart_model.rfn]
+#
+# When the artifact exists, app.py memory-maps it instead of compiling the
+# model, and (with hot reload enabled) picks up a newly exported version
+# without a restart. The artifact records a fingerprint of the pickle, and
+# app.py only scores large inputs with the pickle while the two match. The new file is written beside the old one and renamed
+# over it, so serving processes never read a half-written artifact.
+
+import argparse
+import os
+import pickle
+
+import numpy as np
+
+from forest_engine import CompiledForest, source_fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the pickled forest to a flat binary artifact.')
+    parser.add_argument('--model', default='random_forest_heart_model.pkl')
+    parser.add_argument('--output', default='random_forest_heart_model.rfn')
+    parser.add_argument('--check', default='heart.txt', help='CSV used to verify the artifact matches the model')
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        data = f.read()
+    model = pickle.loads(data)
+    engine = CompiledForest.from_model(model)
+    # Lets app.py tell whether the pickle beside the artifact is still the
+    # one it was exported from before scoring large inputs with it.
+    engine.source = source_fingerprint(data, engine.n_estimators)
+    staged = f"{args.output}.new"
+    engine.save(staged)
+
+    if args.check:
+        import pandas as pd
+        df = pd.read_csv(args.check)
+        X = df[list(model.feature_names_in_)] if hasattr(model, 'feature_names_in_') else df.iloc[:, :model.n_features_in_]
+        if not np.array_equal(CompiledForest.load(staged).predict_proba(X), model.predict_proba(X)):
+            os.remove(staged)
+            raise SystemExit(f"Error: exported artifact does not reproduce {args.model} on {args.check}.")
+    os.replace(staged, args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
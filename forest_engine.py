@@ -0,0 +1,256 @@
+# --- Compiled Random Forest inference engine ---
+#
+# Flattens every tree of a fitted scikit-learn RandomForestClassifier into
+# contiguous NumPy node tables and scores rows by walking all trees at once.
+# This skips sklearn's input validation and joblib dispatch, which dominate
+# the cost of a single-row prediction.
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+# Flat artifact layout: magic, little-endian uint64 header length, a JSON
+# header describing each array, then the raw arrays, each 64-byte aligned so
+# they can be used in place from a read-only memory map.
+ARTIFACT_MAGIC = b'RFNODES1'
+ARTIFACT_ALIGN = 64
+ARTIFACT_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'missing_left')
+
+
+def _aligned(offset):
+    return -(-offset // ARTIFACT_ALIGN) * ARTIFACT_ALIGN
+
+
+def source_fingerprint(pickle_bytes, n_estimators):
+    """Identifies the pickled forest an artifact was exported from."""
+    return {'sha256': hashlib.sha256(pickle_bytes).hexdigest(), 'n_estimators': int(n_estimators)}
+
+
+class CompiledForest:
+    """Array-backed copy of a fitted RandomForestClassifier."""
+
+    # Rows scored per traversal block; bounds the (rows x trees) index matrix.
+    block_size = 4096
+    # Trees walked between early-exit checks once a vote could be decided.
+    exit_check_trees = 8
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, early_exit=False,
+                 missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        # Per node, whether a NaN feature value goes to the left child, as
+        # learned by sklearn >= 1.3. None means NaN input is rejected.
+        self.missing_left = missing_left
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_estimators = len(roots)
+        self.n_features_in_ = None
+        # When set, predict() stops walking trees for a row once the trees
+        # left cannot change its label. predict_proba() always uses them all.
+        self.early_exit = early_exit
+        # source_fingerprint() of the pickle these tables reproduce exactly,
+        # set by export_model.py. None for anything else, e.g. a compact variant.
+        self.source = None
+
+    @classmethod
+    def from_model(cls, model):
+        """Builds the node tables from a fitted RandomForestClassifier."""
+        features, thresholds, lefts, rights, values, roots, missing = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            is_leaf = left == -1
+            own = np.arange(n_nodes, dtype=np.int64)
+            # Leaves point back at themselves so every row can take exactly
+            # max_depth steps without per-step masking.
+            left = np.where(is_leaf, own, left) + offset
+            right = np.where(is_leaf, own, right) + offset
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(left)
+            rights.append(right)
+            values.append(tree.value[:, 0, :model.n_classes_])
+            if hasattr(tree, 'missing_go_to_left'):
+                missing.append(tree.missing_go_to_left.astype(bool))
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        engine = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            classes=model.classes_,
+            missing_left=np.concatenate(missing) if missing else None,
+        )
+        engine.n_features_in_ = model.n_features_in_
+        return engine
+
+    def save(self, path):
+        """Writes the node tables to a flat binary artifact.
+
+        The file is written next to path and renamed over it, so a process
+        watching path never sees a partially written artifact.
+        """
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in ARTIFACT_ARRAYS
+                  if getattr(self, name) is not None}
+        header = {
+            'max_depth': int(self.max_depth),
+            'n_features_in': None if self.n_features_in_ is None else int(self.n_features_in_),
+            'classes': self.classes_.tolist(),
+            'classes_dtype': self.classes_.dtype.str,
+            'early_exit': bool(self.early_exit),
+            'source': self.source,
+            'arrays': {},
+        }
+        # Offsets are relative to the data section, which starts at the first
+        # aligned position after the header.
+        position = 0
+        for name, array in arrays.items():
+            header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': position}
+            position = _aligned(position + array.nbytes)
+        encoded = json.dumps(header, sort_keys=True).encode()
+        data_start = _aligned(len(ARTIFACT_MAGIC) + 8 + len(encoded))
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(ARTIFACT_MAGIC)
+            f.write(struct.pack('<Q', len(encoded)))
+            f.write(encoded)
+            for name, array in arrays.items():
+                f.write(b'\0' * (data_start + header['arrays'][name]['offset'] - f.tell()))
+                f.write(array.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps an artifact written by save().
+
+        The node tables are read-only views into the map, so processes that
+        load or inherit the same file share its pages instead of each holding
+        a private copy.
+        """
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC:
+            buffer.close()
+            raise ValueError(f"{path} is not a compiled forest artifact.")
+        (header_len,) = struct.unpack_from('<Q', buffer, len(ARTIFACT_MAGIC))
+        start = len(ARTIFACT_MAGIC) + 8
+        header = json.loads(buffer[start:start + header_len])
+        data_start = _aligned(start + header_len)
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape']))
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + spec['offset']).reshape(spec['shape'])
+        engine = cls(
+            max_depth=header['max_depth'],
+            classes=np.asarray(header['classes'], dtype=header['classes_dtype']),
+            early_exit=header.get('early_exit', False),
+            **arrays,
+        )
+        engine.n_features_in_ = header['n_features_in']
+        engine.source = header.get('source')
+        return engine
+
+    def _check_input(self, X):
+        # sklearn trees compare float32 features against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2D array, got an array of shape {X.shape}.")
+        if self.n_features_in_ is not None and X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model is expecting {self.n_features_in_} features as input."
+            )
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        if self.missing_left is None and np.isnan(X).any():
+            raise ValueError("Input X contains NaN.")
+        return X
+
+    def _leaves(self, X, roots=None):
+        """Returns the (rows, trees) matrix of leaf node indices for X."""
+        roots = self.roots if roots is None else roots
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(roots, (X.shape[0], len(roots)))
+        has_nan = self.missing_left is not None and np.isnan(X).any()
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            go_left = values <= self.threshold[nodes]
+            if has_nan:
+                # NaN compares false; send it where sklearn learned to.
+                go_left |= np.isnan(values) & self.missing_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """Predicts class probabilities exactly as the source forest does."""
+        X = self._check_input(X)
+        proba = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], self.block_size):
+            block = X[start:start + self.block_size]
+            votes = self.value[self._leaves(block)]
+            # cumsum adds trees one at a time in order, matching the
+            # sequential accumulation in sklearn so results are bit-identical.
+            # Summing in float64 keeps that true for narrower leaf values.
+            proba[start:start + len(block)] = np.cumsum(votes, axis=1, dtype=np.float64)[:, -1]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        """Predicts class labels for X."""
+        if self.early_exit:
+            return self._predict_early_exit(self._check_input(X))
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1), axis=0)
+
+    def _predict_early_exit(self, X):
+        """Predicts labels, dropping each row once its vote is decided.
+
+        Each tree adds at most 1 to the class totals, so once the leading
+        class is ahead of the runner-up by more than the number of trees
+        left, the label can no longer change. No row can be decided before
+        half the trees have voted; after that the check runs every
+        exit_check_trees trees. Labels match predict() without early exit.
+        """
+        labels = np.empty(X.shape[0], dtype=np.intp)
+        checkpoints = list(range(self.n_estimators // 2 + 1, self.n_estimators, self.exit_check_trees))
+        bounds = list(zip([0] + checkpoints, checkpoints + [self.n_estimators]))
+        for start in range(0, X.shape[0], self.block_size):
+            block = X[start:start + self.block_size]
+            totals = np.zeros((len(block), self.value.shape[1]), dtype=np.float64)
+            active = np.arange(len(block))
+            for first, last in bounds:
+                votes = self.value[self._leaves(block[active], self.roots[first:last])]
+                # Continue the same sequential sum predict_proba() computes.
+                running = np.concatenate((totals[active][:, None], votes), axis=1)
+                totals[active] = np.cumsum(running, axis=1, dtype=np.float64)[:, -1]
+                if last == self.n_estimators:
+                    break
+                ranked = np.sort(totals[active], axis=1)
+                # The small slack absorbs rounding in the running sums.
+                decided = ranked[:, -1] - ranked[:, -2] > (self.n_estimators - last) + 1e-6
+                labels[start + active[decided]] = np.argmax(totals[active[decided]], axis=1)
+                active = active[~decided]
+                if not len(active):
+                    break
+            if len(active):
+                labels[start + active] = np.argmax(totals[active] / self.n_estimators, axis=1)
+        return self.classes_.take(labels, axis=0)
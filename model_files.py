@@ -0,0 +1,48 @@
+# --- Loading the served model from disk ---
+#
+# Kept apart from app.py so that process-pool workers started with spawn
+# (which import whatever their initializer refers to) can reload the model
+# without importing the app and everything it starts at module level.
+
+import os
+import pickle
+
+from forest_engine import CompiledForest, source_fingerprint
+
+
+def load_model(model_path, artifact_path, artifact_only=False):
+    """Loads the model, preferring the artifact. Returns (model, engine, source path).
+
+    model is the sklearn forest used for large inputs. With the artifact, the
+    pickle is only unpickled when the artifact was exported from that exact
+    file, so both always give the same predictions. Otherwise (a compact
+    variant, a stale export, no pickle, or artifact_only) the engine scores
+    everything, and bulk jobs are several times slower.
+    """
+    if os.path.exists(artifact_path):
+        engine = CompiledForest.load(artifact_path)
+        model = engine
+        if engine.source and not artifact_only and os.path.exists(model_path):
+            with open(model_path, 'rb') as f:
+                data = f.read()
+            if source_fingerprint(data, engine.n_estimators) == engine.source:
+                model = pickle.loads(data)
+            else:
+                print(f"Warning: {artifact_path} was not exported from the current {model_path}; "
+                      f"serving from the artifact alone. Re-run export_model.py.")
+        return model, engine, artifact_path
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    # Flattened copy of the forest used for low-latency single-row scoring.
+    # Falls back to model.predict if the pickle is not a plain random forest.
+    try:
+        engine = CompiledForest.from_model(model)
+    except Exception as e:
+        print(f"Warning: could not compile model, using sklearn predict ({e}).")
+        engine = None
+    return model, engine, model_path
+
+
+def load_bulk_model(model_path, artifact_path, artifact_only=False):
+    """Loads only the forest bulk jobs are scored with; pool workers call this after a reload."""
+    return load_model(model_path, artifact_path, artifact_only)[0]
@@ -0,0 +1,116 @@
+# --- Multi-core bulk scoring ---
+#
+# Splits large inputs into row partitions and scores them on a process pool
+# that is started once. On platforms with fork() the workers inherit the
+# already-loaded forest from the parent, so it is never pickled; elsewhere it
+# is pickled once per worker by the pool initializer, never per task. The
+# loader goes along with it, so under spawn it must be importable without
+# side effects, i.e. not defined in a module that starts a pool on import.
+#
+# The pool lives as long as the app. When the model is reloaded, the tasks
+# carry a new generation number and each worker loads the new model itself
+# before its next partition, so no new processes are forked from a parent
+# that is already running threads.
+
+import itertools
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# The forest used inside pool workers, the generation it belongs to, and the
+# function that loads the current one from disk.
+_worker_model = None
+_worker_generation = 0
+_worker_loader = None
+
+
+def _init_worker(model, loader):
+    global _worker_model, _worker_loader
+    _worker_model = model
+    _worker_loader = loader
+
+
+def _model_for(generation):
+    """Returns the worker's model, first loading it again if the parent has reloaded."""
+    global _worker_model, _worker_generation
+    if generation > _worker_generation:
+        _worker_model = _worker_loader()
+        _worker_generation = generation
+    return _worker_model
+
+
+def _score_partition(generation, X):
+    return _model_for(generation).predict(X)
+
+
+def _proba_partition(generation, X):
+    return _model_for(generation).predict_proba(X)
+
+
+class ParallelScorer:
+    """Scores row partitions on a persistent process pool."""
+
+    def __init__(self, model, workers=None, partition_rows=20000, loader=None):
+        global _worker_model, _worker_loader
+        # (model, generation), replaced as a whole by set_model().
+        self._current = (model, 0)
+        self.loader = loader
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_rows = partition_rows
+        if 'fork' in multiprocessing.get_all_start_methods():
+            _worker_model, _worker_loader = model, loader
+            context, initializer, initargs = multiprocessing.get_context('fork'), None, ()
+        else:
+            context, initializer, initargs = None, _init_worker, (model, loader)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=initializer, initargs=initargs,
+        )
+        # The pool forks lazily on first submit; do it now, while the process
+        # is still single-threaded, rather than from inside a request.
+        self._pool.submit(int).result()
+
+    @property
+    def model(self):
+        return self._current[0]
+
+    def set_model(self, model):
+        """Switches to a newly loaded model without restarting the pool.
+
+        Workers call the loader given at construction to load it before
+        their next partition. Partitions already running finish on the old
+        model.
+        """
+        if self.loader is None:
+            raise RuntimeError('ParallelScorer needs a loader to switch models.')
+        self._current = (model, self._current[1] + 1)
+
+    def partitions(self, n_rows):
+        """Returns (start, stop) row bounds for splitting n_rows across the pool."""
+        n_parts = min(self.workers, math.ceil(n_rows / self.partition_rows))
+        bounds = np.linspace(0, n_rows, max(n_parts, 1) + 1).astype(int)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _map(self, X, method, partition_fn):
+        model, generation = self._current
+        parts = self.partitions(len(X))
+        if len(parts) <= 1:
+            return getattr(model, method)(X)
+        take = X.iloc if hasattr(X, 'iloc') else X
+        results = self._pool.map(partition_fn, itertools.repeat(generation), [take[start:stop] for start, stop in parts])
+        return np.concatenate(list(results))
+
+    def predict(self, X):
+        """Predicts labels for X, keeping the original row order."""
+        return self._map(X, 'predict', _score_partition)
+
+    def predict_proba(self, X):
+        """Predicts class probabilities for X, keeping the original row order."""
+        return self._map(X, 'predict_proba', _proba_partition)
+
+    def shutdown(self):
+        self._pool.shutdown()
@@ -0,0 +1,70 @@
+# --- Memoizing prediction cache ---
+#
+# Maps canonical 13-feature tuples to their predicted label so repeated
+# patient profiles skip inference. Entries are evicted least-recently-used
+# first, and the whole cache is dropped whenever the app swaps in a new model.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of single-row predictions."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by clear(), so a label computed with the model from before
+        # a reload is never stored after it.
+        self._generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(features):
+        """Canonicalizes a feature row to the values the model actually sees.
+
+        The forest compares float32 features, so 1, 1.0 and "1" share a key;
+        adding 0 folds -0.0 into 0.0. NaN never equals itself, so missing
+        values are keyed as None.
+        """
+        values = (np.asarray(features, dtype=np.float32) + np.float32(0)).tolist()
+        return tuple(None if value != value else value for value in values)
+
+    def lookup(self, features, compute):
+        """Returns the cached label for features, calling compute(features) on a miss."""
+        key = self.key(features)
+        with self._lock:
+            generation = self._generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key]
+            self._stats['misses'] += 1
+
+        label = compute(features)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = label
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return label
+
+    def clear(self):
+        """Drops every entry; call it whenever the model changes."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), maxsize=self.maxsize)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
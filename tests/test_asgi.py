@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    import asgi  # noqa: E402
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+
+def test_try_acquire_stops_at_capacity():
+    async def scenario():
+        executor = asgi.InferenceExecutor(workers=1, queue_size=1)
+        assert executor.try_acquire() and executor.try_acquire()
+        assert not executor.has_capacity() and not executor.try_acquire()
+        assert executor.in_flight == 2
+        await executor.release()
+        assert executor.try_acquire()
+        assert executor.in_flight == 2
+        executor.shutdown()
+    run(scenario())
+
+
+def test_acquire_waits_for_a_slot_up_to_its_timeout():
+    async def scenario():
+        executor = asgi.InferenceExecutor(workers=1, queue_size=0)
+        assert await executor.acquire(timeout=1)
+        assert not await executor.acquire(timeout=0.05)
+        waiter = asyncio.create_task(executor.acquire(timeout=5))
+        await asyncio.sleep(0.05)
+        await executor.release()
+        assert await waiter
+        assert executor.in_flight == 1
+        executor.shutdown()
+    run(scenario())
+
+
+def test_resuming_responses_come_before_new_requests():
+    async def scenario():
+        executor = asgi.InferenceExecutor(workers=1, queue_size=0)
+        assert executor.try_acquire()
+        resumed = asyncio.create_task(executor.resume())
+        newcomer = asyncio.create_task(executor.acquire(timeout=5))
+        await asyncio.sleep(0.05)
+        await executor.release()
+        await resumed
+        await asyncio.sleep(0.05)
+        assert not newcomer.done() and executor.in_flight == 1
+        await executor.release()
+        assert await newcomer
+        assert executor.in_flight == 1
+        executor.shutdown()
+    run(scenario())
+
+
+def test_slow_uploads_hold_no_slot():
+    async def scenario():
+        server = asgi.AsgiApp(asgi.flask_app.app, workers=2, queue_size=0)
+        stalled = asyncio.Event()
+
+        async def stalled_receive():
+            await stalled.wait()
+            return {'type': 'http.disconnect'}
+
+        async def discard(message):
+            pass
+
+        upload = {'type': 'http', 'method': 'POST', 'path': '/bulk_predict', 'headers': []}
+        uploads = [asyncio.create_task(server(upload, stalled_receive, discard)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert server.executor.in_flight == 0
+
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def record(message):
+            sent.append(message)
+
+        await server({'type': 'http', 'method': 'GET', 'path': '/', 'headers': []}, receive, record)
+        assert sent[0]['status'] == 200
+        assert server.executor.in_flight == 0
+        stalled.set()
+        await asyncio.gather(*uploads)
+        server.executor.shutdown()
+    run(scenario())
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    import app  # noqa: E402
+
+pytestmark = pytest.mark.filterwarnings('ignore:X does not have valid feature names')
+
+ROW = dict(zip(app.REQUIRED_COLUMNS, [52, 1, 0, 125, 212, 0, 1, 168, 0, 1.0, 2, None, 3]))
+MISSPELLED = {('chl' if key == 'chol' else key): value for key, value in ROW.items()}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, 'BULK_CHUNK_ROWS', 2)
+    return app.app.test_client()
+
+
+def post_ndjson(client, rows):
+    body = ''.join(json.dumps(row) + '\n' for row in rows)
+    response = client.post('/batch_predict', data=body, content_type='application/x-ndjson')
+    return response.status_code, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_null_features_are_scored(client):
+    status, lines = post_ndjson(client, [ROW] * 3)
+    assert status == 200
+    assert len(lines) == 3 and all('prediction' in line for line in lines)
+
+
+def test_missing_key_in_first_chunk_is_rejected(client):
+    status, lines = post_ndjson(client, [ROW, MISSPELLED])
+    assert status == 400
+    assert lines == [{'error': 'Line 2 is missing features: chol'}]
+
+
+def test_missing_key_in_later_chunk_ends_the_stream(client):
+    status, lines = post_ndjson(client, [ROW, ROW, ROW, MISSPELLED, ROW])
+    assert status == 200
+    assert len(lines) == 3
+    assert lines[-1] == {'error': 'An error occurred: Line 4 is missing features: chol'}
@@ -0,0 +1,52 @@
+import io
+import os
+import sys
+import warnings
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    import app  # noqa: E402
+
+pytestmark = pytest.mark.filterwarnings('ignore:X does not have valid feature names')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Small chunks, so the streamed upload spans several of them.
+    monkeypatch.setattr(app, 'BULK_CHUNK_ROWS', 100)
+    return app.app.test_client()
+
+
+def bulk_predict(client, csv, stream):
+    response = client.post(f"/bulk_predict?stream={int(stream)}",
+                           data={'bulk_file': (io.BytesIO(csv.encode()), 'patients.csv')})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_stream_round_trips_extra_columns_like_buffered(client):
+    df = pd.read_csv(os.path.join(ROOT, 'heart.txt')).head(350)
+    df['patient_id'] = 1234567890 + df.index
+    df['score'] = 120.5632705078125 + df.index
+    df['note'] = ['a, b'] * len(df)
+    csv = df.to_csv(index=False)
+
+    streamed = bulk_predict(client, csv, stream=True)
+    buffered = bulk_predict(client, csv, stream=False)
+    assert not streamed.rstrip().splitlines()[-1].startswith('#')
+
+    streamed_df = pd.read_csv(io.StringIO(streamed), dtype=str)
+    buffered_df = pd.read_csv(io.StringIO(buffered), dtype=str)
+    assert list(streamed_df.columns) == list(buffered_df.columns)
+    extra = ['target', 'patient_id', 'score', 'note', 'prediction']
+    pd.testing.assert_frame_equal(streamed_df[extra], buffered_df[extra])
+    assert streamed_df['score'].iloc[0] == '120.5632705078125'
+    # Features may be formatted differently (1.0 comes back as 1), not valued.
+    features = app.REQUIRED_COLUMNS
+    pd.testing.assert_frame_equal(streamed_df[features].astype(float), buffered_df[features].astype(float))
@@ -0,0 +1,73 @@
+import os
+import pickle
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from forest_engine import CompiledForest, source_fingerprint  # noqa: E402
+
+pytestmark = pytest.mark.filterwarnings('ignore:X does not have valid feature names')
+
+
+@pytest.fixture(scope='module')
+def model():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        with open(os.path.join(ROOT, 'random_forest_heart_model.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+
+@pytest.fixture(scope='module')
+def rows(model):
+    """heart.txt plus copies of it with some feature values blanked out."""
+    X = pd.read_csv(os.path.join(ROOT, 'heart.txt'))[list(model.feature_names_in_)].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    blanked = X.copy()
+    blanked[rng.random(X.shape) < 0.2] = np.nan
+    all_missing = np.full((1, X.shape[1]), np.nan)
+    return np.vstack([X, blanked, all_missing])
+
+
+@pytest.fixture(params=['compiled', 'artifact'])
+def engine(request, model, tmp_path):
+    engine = CompiledForest.from_model(model)
+    if request.param == 'artifact':
+        engine.save(tmp_path / 'model.rfn')
+        engine = CompiledForest.load(tmp_path / 'model.rfn')
+    return engine
+
+
+def test_matches_sklearn_exactly(model, engine, rows):
+    np.testing.assert_array_equal(engine.predict_proba(rows), model.predict_proba(rows))
+    np.testing.assert_array_equal(engine.predict(rows), model.predict(rows))
+
+
+def test_single_rows_match_sklearn(model, engine, rows):
+    for row in rows[::97]:
+        assert engine.predict(row[None, :])[0] == model.predict(row[None, :])[0]
+
+
+def test_early_exit_matches_sklearn_labels(model, engine, rows):
+    engine.early_exit = True
+    np.testing.assert_array_equal(engine.predict(rows), model.predict(rows))
+
+
+def test_rejects_infinity(engine, rows):
+    with pytest.raises(ValueError, match='infinity'):
+        engine.predict(np.where(np.arange(rows.shape[1]) == 4, np.inf, rows[:1]))
+
+
+def test_artifact_records_source_fingerprint(model, tmp_path):
+    engine = CompiledForest.from_model(model)
+    assert engine.source is None
+    engine.source = source_fingerprint(b'pickle bytes', engine.n_estimators)
+    engine.save(tmp_path / 'model.rfn')
+    loaded = CompiledForest.load(tmp_path / 'model.rfn')
+    assert loaded.source == source_fingerprint(b'pickle bytes', loaded.n_estimators)
+    assert loaded.source != source_fingerprint(b'other bytes', loaded.n_estimators)
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs app.py with a bulk pool whose workers are spawned rather than forked,
+# as on platforms without fork(), and scores enough rows to use every worker.
+SPAWN_SCRIPT = textwrap.dedent('''
+    import multiprocessing, warnings
+    import numpy as np, pandas as pd
+    warnings.filterwarnings('ignore')
+    multiprocessing.set_start_method('spawn')
+    multiprocessing.get_all_start_methods = lambda: ['spawn']
+    import app
+    X = pd.concat([pd.read_csv('heart.txt')[app.REQUIRED_COLUMNS]] * 60, ignore_index=True)
+    assert np.array_equal(app.bulk_scorer.predict(X), app.model.predict(X))
+    app.bulk_scorer.set_model(app.model)
+    assert np.array_equal(app.bulk_scorer.predict(X), app.model.predict(X))
+    print('ok')
+''')
+
+
+def test_spawned_pool_workers_do_not_import_the_app():
+    env = dict(os.environ, HEART_BULK_WORKERS='2', HEART_BULK_PARTITION_ROWS='10000',
+               HEART_MODEL_ARTIFACT='missing.rfn', PYTHONWARNINGS='ignore')
+    result = subprocess.run([sys.executable, '-c', SPAWN_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == 'ok'
@@ -0,0 +1,40 @@
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from prediction_cache import PredictionCache  # noqa: E402
+
+ROW = [52, 1, 0, 125, 212, 0, 1, 168, 0, 1.0, 2, 2, 3]
+
+
+def test_equivalent_rows_share_an_entry():
+    cache = PredictionCache(8)
+    assert cache.lookup(ROW, lambda features: 1) == 1
+    assert cache.lookup([str(value) for value in ROW], lambda features: 0) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_missing_values_hit():
+    cache = PredictionCache(8)
+    row = ROW[:11] + [None, 3]
+    for _ in range(5):
+        cache.lookup(row, lambda features: 1)
+        cache.lookup(ROW[:11] + [math.nan, 3], lambda features: 1)
+    stats = cache.stats()
+    assert (stats['misses'], stats['hits'], stats['size']) == (1, 9, 1)
+
+
+def test_label_computed_before_clear_is_not_stored():
+    cache = PredictionCache(8)
+
+    def compute_across_reload(features):
+        cache.clear()
+        return 0
+
+    assert cache.lookup(ROW, compute_across_reload) == 0
+    assert cache.stats()['size'] == 0
+    assert cache.lookup(ROW, lambda features: 1) == 1
+    assert cache.lookup(ROW, lambda features: 0) == 1